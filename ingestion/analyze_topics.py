@@ -6,19 +6,42 @@ Analyzes existing articles in the database to discover common topics and themes.
 Uses Claude to extract and categorize topics from article titles and summaries.
 
 Usage:
-    python analyze_topics.py
+    python analyze_topics.py              # Submit via the Message Batches API (half price)
+    python analyze_topics.py --realtime   # Concurrent messages.create calls (faster)
 
 Output:
     - topic_analysis.json (full results)
     - Printed summary of top topics
+
+Optional view (run in Supabase SQL Editor) so only a 300-char preview of each
+article is transferred instead of its full content:
+
+    CREATE OR REPLACE VIEW articles_topic_preview AS
+    SELECT
+      id,
+      published_at,
+      title,
+      source_name,
+      CASE WHEN length(coalesce(nullif(summary, ''), content, '')) > 300
+           THEN left(coalesce(nullif(summary, ''), content, ''), 300) || '...'
+           ELSE coalesce(nullif(summary, ''), content, '')
+      END AS summary_short
+    FROM articles;
 """
 
-import json
+import argparse
+import asyncio
+import hashlib
 import logging
 import os
+import re
 import sys
+import time
+from bisect import bisect_right
 from collections import defaultdict
+from itertools import combinations
 
+import orjson
 from dotenv import load_dotenv
 
 # Load ingestion .env, then fill in missing keys from frontend .env.local
@@ -37,6 +60,67 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 BATCH_SIZE = 25  # Articles per Claude call
+PAGE_SIZE = 500  # Rows per Supabase request (Supabase caps responses at 1000)
+PREVIEW_VIEW = "articles_topic_preview"  # Server-side truncated summaries (see docstring)
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+CLAUDE_CONCURRENCY = int(os.getenv("CLAUDE_CONCURRENCY", "10"))  # Max in-flight Claude calls
+BATCH_POLL_SECONDS = 15  # Message Batches API status poll interval
+MAX_TOPIC_WORDS = 6  # Longer topic names are matched by a scan, not the sub-token-set index
+
+_TSV_CTRL = str.maketrans("\r\n\t", "   ")
+
+# Claude's JSON reply, either inside a ```json fence or bare amid other text
+_JSON_RE = re.compile(r"```(?:json)?\s*(\{.*\})\s*```|(\{.*\})", re.S)
+
+
+def iter_articles(client, columns, table="articles", page_size=PAGE_SIZE):
+    """
+    Yield every article, newest first, using keyset pagination.
+
+    Each page continues from the last (published_at, id) seen rather than
+    using OFFSET, so Postgres never re-scans rows it already returned.
+    Articles without a published date come first, as they do under
+    ORDER BY published_at DESC, paged by id alone.
+    """
+    columns = f"id, published_at, {columns}"
+
+    last_id = None
+    while True:
+        query = (
+            client.table(table)
+            .select(columns)
+            .is_("published_at", "null")
+            .order("id", desc=True)
+            .limit(page_size)
+        )
+        if last_id:
+            query = query.lt("id", last_id)
+        batch = query.execute().data or []
+        yield from batch
+        if len(batch) < page_size:
+            break
+        last_id = batch[-1]["id"]
+
+    last = None
+    while True:
+        query = (
+            client.table(table)
+            .select(columns)
+            .not_.is_("published_at", "null")
+            .order("published_at", desc=True)
+            .order("id", desc=True)
+            .limit(page_size)
+        )
+        if last:
+            ts, last_id = last["published_at"], last["id"]
+            query = query.or_(
+                f'published_at.lt."{ts}",and(published_at.eq."{ts}",id.lt."{last_id}")'
+            )
+        batch = query.execute().data or []
+        yield from batch
+        if len(batch) < page_size:
+            break
+        last = batch[-1]
 
 
 def fetch_all_articles():
@@ -51,54 +135,83 @@ def fetch_all_articles():
 
     client = create_client(url, key)
 
-    # Supabase returns max 1000 rows per request — paginate
-    all_articles = []
-    offset = 0
-    page_size = 500
-
-    while True:
-        result = (
-            client.table("articles")
-            .select("title, summary, content, source_name")
-            .order("published_at", desc=True)
-            .range(offset, offset + page_size - 1)
-            .execute()
+    try:
+        all_articles = list(
+            iter_articles(client, "title, source_name, summary_short", table=PREVIEW_VIEW)
         )
-        batch = result.data or []
-        all_articles.extend(batch)
-        if len(batch) < page_size:
-            break
-        offset += page_size
+    except Exception as e:
+        err_msg = str(e).lower()
+        if "does not exist" not in err_msg and "schema cache" not in err_msg:
+            raise
+        logger.warning(
+            f"View '{PREVIEW_VIEW}' not found — fetching full article content instead. "
+            "See the docstring at the top of this file to create it."
+        )
+        all_articles = list(iter_articles(client, "title, summary, content, source_name"))
 
     logger.info(f"Fetched {len(all_articles)} articles from Supabase")
     return all_articles
 
 
-def analyze_batch(articles, batch_num, total_batches):
-    """Send a batch of articles to Claude for topic extraction."""
-    import anthropic
-
+def _get_anthropic_key():
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         logger.error("ANTHROPIC_API_KEY must be set")
         sys.exit(1)
+    return api_key
 
-    client = anthropic.Anthropic(api_key=api_key)
 
-    # Build article text for the prompt
-    article_lines = []
-    for i, article in enumerate(articles, 1):
-        title = article.get("title", "Untitled")
+def _article_summary(article):
+    """Summary text for the prompt, truncated to keep prompt reasonable."""
+    # The preview view truncates server-side; otherwise truncate here
+    summary = article.get("summary_short")
+    if summary is None:
         summary = article.get("summary") or article.get("content") or ""
-        # Truncate summary to keep prompt reasonable
         if len(summary) > 300:
             summary = summary[:300] + "..."
-        source = article.get("source_name", "Unknown")
-        article_lines.append(f"{i}. [{source}] {title}\n   {summary}")
+    return summary
 
-    articles_text = "\n\n".join(article_lines)
 
-    prompt = f"""Analyze these article titles and summaries. Extract the main topics and themes.
+def _tsv_field(value):
+    """Flatten tabs/newlines so a value can't break the TSV row layout."""
+    return (value or "").translate(_TSV_CTRL)
+
+
+def format_article_line(article):
+    """The source/title/summary TSV columns for one article's prompt row."""
+    return (
+        f"{_tsv_field(article.get('source_name', 'Unknown'))}"
+        f"\t{_tsv_field(article.get('title', 'Untitled'))}"
+        f"\t{_tsv_field(_article_summary(article))}"
+    )
+
+
+def dedupe_articles(articles):
+    """Keep the first article for each (title, truncated summary) pair."""
+    seen = set()
+    unique = []
+    for article in articles:
+        key = f"{article.get('title') or ''}|{_article_summary(article)}"
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        if digest not in seen:
+            seen.add(digest)
+            unique.append(article)
+    return unique
+
+
+def build_prompt(articles):
+    """
+    Build the topic-extraction prompt for a batch of articles.
+
+    Expects each article's "_prompt_line" from format_article_line (main
+    formats every article once, before batching).
+    """
+    # One tab-separated row per article: idx, source, title, summary
+    articles_text = "\n".join(
+        f"{i}\t{article['_prompt_line']}" for i, article in enumerate(articles, 1)
+    )
+
+    return f"""Analyze these article titles and summaries. Extract the main topics and themes.
 
 For each distinct topic you identify, provide:
 - Topic name (short, 2-3 words max)
@@ -122,43 +235,198 @@ Return ONLY valid JSON, no other text:
   ]
 }}
 
-Articles:
+Articles (one per line, columns: idx<TAB>source<TAB>title<TAB>summary):
 
 {articles_text}"""
 
-    logger.info(f"Analyzing batch {batch_num}/{total_batches} ({len(articles)} articles)...")
 
-    message = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=2048,
-        messages=[{"role": "user", "content": prompt}],
-    )
-
-    text = message.content[0].text.strip()
+def parse_response(text, batch_num):
+    """Parse Claude's JSON topic list, tolerating code fences and stray prose."""
+    # Prefer a fenced ```json block; otherwise take the outermost {...}
+    match = _JSON_RE.search(text)
+    payload = (match.group(1) or match.group(2)) if match else text
 
-    # Try to extract JSON from the response
     try:
-        # Handle case where Claude wraps in markdown code block
-        if text.startswith("```"):
-            text = text.split("```")[1]
-            if text.startswith("json"):
-                text = text[4:]
-            text = text.strip()
-        return json.loads(text)
-    except json.JSONDecodeError:
-        logger.warning(f"Failed to parse JSON from batch {batch_num}, attempting repair...")
-        # Try to find JSON object in the text
-        start = text.find("{")
-        end = text.rfind("}") + 1
-        if start >= 0 and end > start:
-            try:
-                return json.loads(text[start:end])
-            except json.JSONDecodeError:
-                pass
+        return orjson.loads(payload)
+    except orjson.JSONDecodeError:
         logger.error(f"Could not parse response for batch {batch_num}")
         return {"topics": []}
 
 
+async def analyze_batch(client, semaphore, articles, batch_num, total_batches):
+    """Send a batch of articles to Claude for topic extraction."""
+    prompt = build_prompt(articles)
+
+    async with semaphore:
+        logger.info(f"Analyzing batch {batch_num}/{total_batches} ({len(articles)} articles)...")
+        message = await client.messages.create(
+            model=CLAUDE_MODEL,
+            max_tokens=2048,
+            messages=[{"role": "user", "content": prompt}],
+        )
+
+    return parse_response(message.content[0].text, batch_num)
+
+
+async def analyze_batches(batches):
+    """
+    Analyze all batches concurrently, at most CLAUDE_CONCURRENCY in flight.
+
+    A single AsyncAnthropic client is shared so every request reuses the same
+    connection pool. Results are returned in batch order; a batch that raises
+    contributes an empty topic list instead of aborting the whole run.
+    """
+    import anthropic
+
+    client = anthropic.AsyncAnthropic(api_key=_get_anthropic_key())
+    semaphore = asyncio.Semaphore(CLAUDE_CONCURRENCY)
+    total_batches = len(batches)
+
+    results = await asyncio.gather(
+        *(
+            analyze_batch(client, semaphore, batch, i, total_batches)
+            for i, batch in enumerate(batches, 1)
+        ),
+        return_exceptions=True,
+    )
+
+    all_results = []
+    for i, result in enumerate(results, 1):
+        if isinstance(result, Exception):
+            logger.error(f"Batch {i}/{total_batches} failed: {result}")
+            result = {"topics": []}
+        all_results.append(result)
+    return all_results
+
+
+def analyze_batches_offline(batches):
+    """
+    Analyze all batches through the Anthropic Message Batches API.
+
+    Every prompt goes out in a single submission, which is billed at half the
+    price of regular calls. Topic analysis is not interactive, so waiting a few
+    minutes for the batch to finish processing is an acceptable trade.
+    Results are matched back to their batch by custom_id.
+    """
+    import anthropic
+
+    client = anthropic.Anthropic(api_key=_get_anthropic_key())
+    total_batches = len(batches)
+
+    message_batch = client.messages.batches.create(
+        requests=[
+            {
+                "custom_id": f"batch-{i}",
+                "params": {
+                    "model": CLAUDE_MODEL,
+                    "max_tokens": 2048,
+                    "messages": [{"role": "user", "content": build_prompt(batch)}],
+                },
+            }
+            for i, batch in enumerate(batches, 1)
+        ]
+    )
+    logger.info(f"Submitted message batch {message_batch.id} ({total_batches} requests)")
+
+    while message_batch.processing_status != "ended":
+        time.sleep(BATCH_POLL_SECONDS)
+        message_batch = client.messages.batches.retrieve(message_batch.id)
+        counts = message_batch.request_counts
+        logger.info(
+            f"Batch {message_batch.id}: {message_batch.processing_status} "
+            f"({counts.succeeded} succeeded, {counts.errored} errored, {counts.processing} processing)"
+        )
+
+    all_results = [{"topics": []} for _ in batches]
+    for entry in client.messages.batches.results(message_batch.id):
+        batch_num = int(entry.custom_id.rsplit("-", 1)[1])
+        if entry.result.type != "succeeded":
+            logger.error(f"Batch {batch_num}/{total_batches} {entry.result.type}")
+            continue
+        all_results[batch_num - 1] = parse_response(entry.result.message.content[0].text, batch_num)
+    return all_results
+
+
+def _token_subsets(tokens):
+    """All sub-token-sets of 2+ words (topic names are only a few words long)."""
+    ordered = sorted(tokens)
+    return [
+        frozenset(combo)
+        for size in range(2, len(ordered) + 1)
+        for combo in combinations(ordered, size)
+    ]
+
+
+def _words_overlap(tokens, other):
+    """Both names have 2+ words and one's words are all in the other."""
+    return len(tokens) >= 2 and len(other) >= 2 and (tokens <= other or other <= tokens)
+
+
+class _SubstringIndex:
+    """
+    Canonical topic names, searchable for substring matches in either direction.
+
+    Names are appended to one newline-separated bytearray, so "query is inside
+    a name" is a C-level find() rather than a Python loop over every name, and
+    "a name is inside the query" is a dict lookup per substring of the (short)
+    query. Like iterating a dict, find() returns the earliest-added live name;
+    renaming an entry removes it and re-adds it at the end.
+
+    Names are located by their recorded offsets, not by splitting on the
+    separator, so a name may itself contain newlines; only a query that does
+    could match across two names, and that rare case is scanned instead.
+    """
+
+    def __init__(self):
+        self._haystack = bytearray(b"\n")
+        self._starts = []  # haystack offset of every name ever added (ascending)
+        self._names = []  # name at each offset
+        self._entries = []  # entry at each offset
+        self._live = {}  # current name -> haystack offset
+
+    def add(self, name, entry):
+        offset = len(self._haystack)
+        self._haystack += name.encode() + b"\n"
+        self._starts.append(offset)
+        self._names.append(name)
+        self._entries.append(entry)
+        self._live[name] = offset
+
+    def remove(self, name):
+        del self._live[name]
+
+    def find(self, query):
+        """Earliest entry whose name contains query or is contained in it."""
+        if not self._starts:
+            return None
+
+        best = None
+        # Names containing the query: first live hit in haystack order
+        if "\n" in query:
+            best = min((offset for name, offset in self._live.items() if query in name), default=None)
+        else:
+            needle = query.encode()
+            pos = self._haystack.find(needle, 1)
+            while pos != -1:
+                i = bisect_right(self._starts, pos) - 1
+                offset = self._starts[i]
+                if self._live.get(self._names[i]) == offset:
+                    best = offset
+                    break
+                pos = self._haystack.find(needle, pos + 1)
+
+        # Names contained in the query
+        for i in range(len(query)):
+            for j in range(i + 1, len(query) + 1):
+                offset = self._live.get(query[i:j])
+                if offset is not None and (best is None or offset < best):
+                    best = offset
+
+        if best is None:
+            return None
+        return self._entries[bisect_right(self._starts, best) - 1]
+
+
 def merge_topics(all_batch_results):
     """Merge and deduplicate topics across batches."""
     # Collect all topics
@@ -167,46 +435,87 @@ def merge_topics(all_batch_results):
     for batch_result in all_batch_results:
         for topic in batch_result.get("topics", []):
             name = topic["name"].strip().lower()
+            if not name:
+                continue  # A blank name would "contain" every other topic
             topic_map[name]["count"] += topic.get("count", 1)
             for ex in topic.get("examples", []):
                 topic_map[name]["examples"].add(ex)
 
-    # Now merge similar topics using simple heuristics
-    # Build a list of canonical names
-    canonical = {}
+    # Now merge similar topics using simple heuristics: each topic joins the
+    # earliest canonical name that it is a substring of (or contains), or
+    # whose words are a subset (or superset) of its own. Each canonical entry
+    # is indexed by its token set and every sub-token-set, so word-overlap
+    # candidates are dict lookups instead of a scan over every canonical name.
+    canonical = []  # entries: {"name", "tokens", "order", "count", "examples"}
+    by_name = _SubstringIndex()  # canonical names, for the substring test
+    by_tokens = defaultdict(list)  # token set -> entries that have had it
+    by_subset = defaultdict(list)  # >=2-word subset of a short token set -> entries
+    long_entries = []  # entries that have had more than MAX_TOPIC_WORDS words
+    next_order = 0
+
+    def index_entry(entry):
+        nonlocal next_order
+        # Canonical order: a renamed entry moves to the end, as re-keying the
+        # canonical dict used to do
+        entry["order"] = next_order
+        next_order += 1
+        by_name.add(entry["name"], entry)
+        by_tokens[entry["tokens"]].append(entry)
+        if len(entry["tokens"]) > MAX_TOPIC_WORDS:
+            long_entries.append(entry)
+        else:
+            for subset in _token_subsets(entry["tokens"]):
+                by_subset[subset].append(entry)
+
     for name in sorted(topic_map.keys()):
-        merged = False
-        for canon in list(canonical.keys()):
-            # Check if one is a substring of the other, or very similar
-            if name in canon or canon in name:
-                canonical[canon]["count"] += topic_map[name]["count"]
-                canonical[canon]["examples"].update(topic_map[name]["examples"])
-                merged = True
-                break
-            # Check for word overlap (e.g., "AI safety" and "AI safety research")
-            name_words = set(name.split())
-            canon_words = set(canon.split())
-            if len(name_words) >= 2 and len(canon_words) >= 2:
-                overlap = name_words & canon_words
-                if len(overlap) >= min(len(name_words), len(canon_words)):
-                    # Keep the shorter name as canonical
-                    if len(name) < len(canon):
-                        canonical[name] = canonical.pop(canon)
-                        canonical[name]["count"] += topic_map[name]["count"]
-                        canonical[name]["examples"].update(topic_map[name]["examples"])
-                    else:
-                        canonical[canon]["count"] += topic_map[name]["count"]
-                        canonical[canon]["examples"].update(topic_map[name]["examples"])
-                    merged = True
-                    break
-        if not merged:
-            canonical[name] = topic_map[name]
+        data = topic_map[name]
+        tokens = frozenset(name.split())
+
+        candidates = [by_name.find(name)]
+        if len(tokens) >= 2:
+            # Canonical names containing all of our words...
+            candidates += by_subset.get(tokens, ())
+            candidates += long_entries
+            # ...and canonical names whose words we contain all of
+            if len(tokens) > MAX_TOPIC_WORDS:
+                candidates += canonical
+            else:
+                for subset in _token_subsets(tokens):
+                    candidates += by_tokens.get(subset, ())
+        # Index lists keep entries under names they have since been renamed
+        # from, so re-check every word-overlap candidate against its current
+        # name
+        match = min(
+            (
+                entry for i, entry in enumerate(candidates)
+                if entry is not None and (i == 0 or _words_overlap(tokens, entry["tokens"]))
+            ),
+            key=lambda entry: entry["order"],
+            default=None,
+        )
 
-    # Convert to sorted list
+        if match is not None:
+            # Keep the shorter name as canonical on a word-overlap match
+            is_substring = name in match["name"] or match["name"] in name
+            if not is_substring and len(name) < len(match["name"]):
+                by_name.remove(match["name"])
+                match["name"] = name
+                match["tokens"] = tokens
+                index_entry(match)
+            match["count"] += data["count"]
+            match["examples"].update(data["examples"])
+            continue
+
+        entry = {"name": name, "tokens": tokens, "count": data["count"], "examples": data["examples"]}
+        canonical.append(entry)
+        index_entry(entry)
+
+    # Convert to sorted list (ties keep canonical order)
+    canonical.sort(key=lambda entry: entry["order"])
     topics = []
-    for name, data in canonical.items():
+    for data in canonical:
         # Title case the name
-        display_name = name.title()
+        display_name = data["name"].title()
         examples = sorted(data["examples"])[:5]  # Limit examples
         topics.append({
             "name": display_name,
@@ -219,6 +528,14 @@ def merge_topics(all_batch_results):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Discover common topics across ingested articles")
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="Call Claude directly (concurrently) instead of via the Message Batches API",
+    )
+    args = parser.parse_args()
+
     print("\n" + "=" * 60)
     print("AI News Intelligence Hub - Topic Analysis")
     print("=" * 60)
@@ -233,15 +550,28 @@ def main():
 
     print(f"   Found {len(articles)} articles")
 
+    # Truncate and format every article's prompt row once
+    for article in articles:
+        article["_prompt_line"] = format_article_line(article)
+
+    # Drop duplicate articles (cross-posts, aggregator re-feeds) so Claude
+    # doesn't count the same story twice
+    unique_articles = dedupe_articles(articles)
+    if len(unique_articles) < len(articles):
+        print(f"   Skipped {len(articles) - len(unique_articles)} duplicate articles")
+    articles = unique_articles
+
     # Step 2: Split into batches and analyze
     batches = [articles[i : i + BATCH_SIZE] for i in range(0, len(articles), BATCH_SIZE)]
     total_batches = len(batches)
-    print(f"\n🧠 Analyzing {total_batches} batches with Claude...")
-
-    all_results = []
-    for i, batch in enumerate(batches, 1):
-        result = analyze_batch(batch, i, total_batches)
-        all_results.append(result)
+    if args.realtime:
+        print(f"\n🧠 Analyzing {total_batches} batches with Claude ({CLAUDE_CONCURRENCY} in flight)...")
+        all_results = asyncio.run(analyze_batches(batches))
+    else:
+        print(f"\n🧠 Submitting {total_batches} batches to the Claude Message Batches API...")
+        all_results = analyze_batches_offline(batches)
+
+    for i, result in enumerate(all_results, 1):
         topic_count = len(result.get("topics", []))
         print(f"   Batch {i}/{total_batches}: found {topic_count} topics")
 
@@ -259,8 +589,8 @@ def main():
     }
 
     output_path = os.path.join(os.path.dirname(__file__), "topic_analysis.json")
-    with open(output_path, "w") as f:
-        json.dump(output, f, indent=2)
+    with open(output_path, "wb") as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
     print(f"\n💾 Full results saved to: {output_path}")
 
     # Step 5: Print summary
@@ -8,8 +8,8 @@ This file contains:
 """
 
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import NamedTuple, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,171 +19,191 @@ load_dotenv()
 # =============================================================================
 # Each source has a name, URL, and category for filtering/analytics
 
-RSS_FEEDS = [
+FEED_CATEGORIES = ("ai_company", "tech_news", "research", "community")
+FEED_PRIORITIES = ("high", "medium", "low")
+
+
+class FeedSource(NamedTuple):
+    """An RSS/Atom feed to ingest."""
+    name: str
+    url: str
+    category: str  # One of FEED_CATEGORIES
+    priority: str  # One of FEED_PRIORITIES
+
+
+RSS_FEEDS: tuple[FeedSource, ...] = (
     # Major AI Companies
-    {
-        "name": "Anthropic Blog",
-        "url": "https://www.anthropic.com/rss.xml",
-        "category": "ai_company",
-        "priority": "high"
-    },
-    {
-        "name": "OpenAI Blog", 
-        "url": "https://openai.com/blog/rss.xml",
-        "category": "ai_company",
-        "priority": "high"
-    },
-    {
-        "name": "Google AI Blog",
-        "url": "https://blog.google/technology/ai/rss/",
-        "category": "ai_company",
-        "priority": "high"
-    },
-    {
-        "name": "Meta AI Blog",
-        "url": "https://ai.meta.com/blog/rss/",
-        "category": "ai_company",
-        "priority": "high"
-    },
-    {
-        "name": "Microsoft AI Blog",
-        "url": "https://techcommunity.microsoft.com/t5/s/gxcuf89792/rss/board?board.id=AIPlatformBlog",
-        "category": "ai_company",
-        "priority": "medium"
-    },
+    FeedSource(
+        name="Anthropic Blog",
+        url="https://www.anthropic.com/rss.xml",
+        category="ai_company",
+        priority="high",
+    ),
+    FeedSource(
+        name="OpenAI Blog",
+        url="https://openai.com/blog/rss.xml",
+        category="ai_company",
+        priority="high",
+    ),
+    FeedSource(
+        name="Google AI Blog",
+        url="https://blog.google/technology/ai/rss/",
+        category="ai_company",
+        priority="high",
+    ),
+    FeedSource(
+        name="Meta AI Blog",
+        url="https://ai.meta.com/blog/rss/",
+        category="ai_company",
+        priority="high",
+    ),
+    FeedSource(
+        name="Microsoft AI Blog",
+        url="https://techcommunity.microsoft.com/t5/s/gxcuf89792/rss/board?board.id=AIPlatformBlog",
+        category="ai_company",
+        priority="medium",
+    ),
     
     # Tech News
-    {
-        "name": "TechCrunch AI",
-        "url": "https://techcrunch.com/category/artificial-intelligence/feed/",
-        "category": "tech_news",
-        "priority": "high"
-    },
-    {
-        "name": "The Verge AI",
-        "url": "https://www.theverge.com/rss/ai-artificial-intelligence/index.xml",
-        "category": "tech_news",
-        "priority": "medium"
-    },
-    {
-        "name": "Ars Technica AI",
-        "url": "https://feeds.arstechnica.com/arstechnica/technology-lab",
-        "category": "tech_news",
-        "priority": "medium"
-    },
-    {
-        "name": "MIT Technology Review AI",
-        "url": "https://www.technologyreview.com/feed/",
-        "category": "tech_news",
-        "priority": "high"
-    },
+    FeedSource(
+        name="TechCrunch AI",
+        url="https://techcrunch.com/category/artificial-intelligence/feed/",
+        category="tech_news",
+        priority="high",
+    ),
+    FeedSource(
+        name="The Verge AI",
+        url="https://www.theverge.com/rss/ai-artificial-intelligence/index.xml",
+        category="tech_news",
+        priority="medium",
+    ),
+    FeedSource(
+        name="Ars Technica AI",
+        url="https://feeds.arstechnica.com/arstechnica/technology-lab",
+        category="tech_news",
+        priority="medium",
+    ),
+    FeedSource(
+        name="MIT Technology Review AI",
+        url="https://www.technologyreview.com/feed/",
+        category="tech_news",
+        priority="high",
+    ),
     
     # Research & Academic
-    {
-        "name": "arXiv cs.AI",
-        "url": "https://rss.arxiv.org/rss/cs.AI",
-        "category": "research",
-        "priority": "medium"
-    },
-    {
-        "name": "arXiv cs.LG",
-        "url": "https://rss.arxiv.org/rss/cs.LG",
-        "category": "research", 
-        "priority": "medium"
-    },
+    FeedSource(
+        name="arXiv cs.AI",
+        url="https://rss.arxiv.org/rss/cs.AI",
+        category="research",
+        priority="medium",
+    ),
+    FeedSource(
+        name="arXiv cs.LG",
+        url="https://rss.arxiv.org/rss/cs.LG",
+        category="research",
+        priority="medium",
+    ),
     
     # Additional Tech News & Analysis
-    {
-        "name": "VentureBeat AI",
-        "url": "https://venturebeat.com/category/ai/feed/",
-        "category": "tech_news",
-        "priority": "high"
-    },
-    {
-        "name": "MarkTechPost",
-        "url": "https://marktechpost.com/feed",
-        "category": "tech_news",
-        "priority": "medium"
-    },
-    {
-        "name": "Unite.AI",
-        "url": "https://www.unite.ai/feed/",
-        "category": "tech_news",
-        "priority": "medium"
-    },
-    {
-        "name": "MIT News AI",
-        "url": "https://news.mit.edu/rss/topic/artificial-intelligence",
-        "category": "research",
-        "priority": "high"
-    },
-    {
-        "name": "Hugging Face Blog",
-        "url": "https://huggingface.co/blog/feed.xml",
-        "category": "ai_company",
-        "priority": "high"
-    },
+    FeedSource(
+        name="VentureBeat AI",
+        url="https://venturebeat.com/category/ai/feed/",
+        category="tech_news",
+        priority="high",
+    ),
+    FeedSource(
+        name="MarkTechPost",
+        url="https://marktechpost.com/feed",
+        category="tech_news",
+        priority="medium",
+    ),
+    FeedSource(
+        name="Unite.AI",
+        url="https://www.unite.ai/feed/",
+        category="tech_news",
+        priority="medium",
+    ),
+    FeedSource(
+        name="MIT News AI",
+        url="https://news.mit.edu/rss/topic/artificial-intelligence",
+        category="research",
+        priority="high",
+    ),
+    FeedSource(
+        name="Hugging Face Blog",
+        url="https://huggingface.co/blog/feed.xml",
+        category="ai_company",
+        priority="high",
+    ),
 
     # Independent Analysis & Newsletters
-    {
-        "name": "Simon Willison's Blog",
-        "url": "https://simonwillison.net/atom/everything",
-        "category": "community",
-        "priority": "high"
-    },
-    {
-        "name": "The Batch",
-        "url": "https://www.deeplearning.ai/the-batch/feed/",
-        "category": "tech_news",
-        "priority": "high"
-    },
-    {
-        "name": "Google DeepMind Blog",
-        "url": "https://deepmind.google/blog/rss.xml",
-        "category": "research",
-        "priority": "high"
-    },
-    {
-        "name": "Nvidia AI Blog",
-        "url": "https://blogs.nvidia.com/feed/",
-        "category": "ai_company",
-        "priority": "high"
-    },
+    FeedSource(
+        name="Simon Willison's Blog",
+        url="https://simonwillison.net/atom/everything",
+        category="community",
+        priority="high",
+    ),
+    FeedSource(
+        name="The Batch",
+        url="https://www.deeplearning.ai/the-batch/feed/",
+        category="tech_news",
+        priority="high",
+    ),
+    FeedSource(
+        name="Google DeepMind Blog",
+        url="https://deepmind.google/blog/rss.xml",
+        category="research",
+        priority="high",
+    ),
+    FeedSource(
+        name="Nvidia AI Blog",
+        url="https://blogs.nvidia.com/feed/",
+        category="ai_company",
+        priority="high",
+    ),
 
     # Community & Analysis
-    {
-        "name": "Hacker News",
-        "url": "https://hnrss.org/newest?q=AI+OR+LLM+OR+GPT+OR+Claude+OR+machine+learning",
-        "category": "community",
-        "priority": "low"
-    },
+    FeedSource(
+        name="Hacker News",
+        url="https://hnrss.org/newest?q=AI+OR+LLM+OR+GPT+OR+Claude+OR+machine+learning",
+        category="community",
+        priority="low",
+    ),
 
     # Newsletters & Independent Analysis
-    {
-        "name": "Import AI",
-        "url": "https://importai.substack.com/feed",
-        "category": "community",
-        "priority": "high"
-    },
-    {
-        "name": "The Gradient",
-        "url": "https://thegradient.pub/rss/",
-        "category": "research",
-        "priority": "high"
-    },
-    {
-        "name": "AI Snake Oil",
-        "url": "https://aisnakeoil.substack.com/feed",
-        "category": "community",
-        "priority": "high"
-    },
-    {
-        "name": "Wired AI",
-        "url": "https://www.wired.com/feed/tag/ai/latest/rss",
-        "category": "tech_news",
-        "priority": "high"
-    },
-]
+    FeedSource(
+        name="Import AI",
+        url="https://importai.substack.com/feed",
+        category="community",
+        priority="high",
+    ),
+    FeedSource(
+        name="The Gradient",
+        url="https://thegradient.pub/rss/",
+        category="research",
+        priority="high",
+    ),
+    FeedSource(
+        name="AI Snake Oil",
+        url="https://aisnakeoil.substack.com/feed",
+        category="community",
+        priority="high",
+    ),
+    FeedSource(
+        name="Wired AI",
+        url="https://www.wired.com/feed/tag/ai/latest/rss",
+        category="tech_news",
+        priority="high",
+    ),
+)
+
+
+# Catch typos in categories/priorities at import time
+for _feed in RSS_FEEDS:
+    if _feed.category not in FEED_CATEGORIES:
+        raise ValueError(f"Unknown category {_feed.category!r} for feed {_feed.name!r}")
+    if _feed.priority not in FEED_PRIORITIES:
+        raise ValueError(f"Unknown priority {_feed.priority!r} for feed {_feed.name!r}")
 
 # =============================================================================
 # CHUNKING CONFIGURATION
@@ -209,6 +229,8 @@ class EmbeddingConfig:
     model: str = "text-embedding-3-small"  # OpenAI embedding model
     dimensions: int = 1536  # Embedding dimensions
     batch_size: int = 100  # Articles to embed at once
+    concurrency: int = 4  # Embedding requests in flight at once
+    cache_path: str = "./data/embedding_cache.sqlite"  # "" disables the on-disk cache
     
 EMBEDDING_CONFIG = EmbeddingConfig()
 
@@ -219,12 +241,8 @@ EMBEDDING_CONFIG = EmbeddingConfig()
 @dataclass
 class DatabaseConfig:
     """Configuration for Supabase connection."""
-    url: Optional[str] = None
-    key: Optional[str] = None
-    
-    def __post_init__(self):
-        self.url = os.getenv("SUPABASE_URL")
-        self.key = os.getenv("SUPABASE_KEY")
+    url: Optional[str] = field(default_factory=lambda: os.getenv("SUPABASE_URL"))
+    key: Optional[str] = field(default_factory=lambda: os.getenv("SUPABASE_KEY"))
         
     @property
     def is_configured(self) -> bool:
@@ -239,12 +257,8 @@ DATABASE_CONFIG = DatabaseConfig()
 @dataclass  
 class APIConfig:
     """Configuration for external APIs."""
-    openai_key: Optional[str] = None
-    anthropic_key: Optional[str] = None
-    
-    def __post_init__(self):
-        self.openai_key = os.getenv("OPENAI_API_KEY")
-        self.anthropic_key = os.getenv("ANTHROPIC_API_KEY")
+    openai_key: Optional[str] = field(default_factory=lambda: os.getenv("OPENAI_API_KEY"))
+    anthropic_key: Optional[str] = field(default_factory=lambda: os.getenv("ANTHROPIC_API_KEY"))
 
 API_CONFIG = APIConfig()
 
@@ -258,5 +272,10 @@ class IngestionConfig:
     max_articles_per_feed: int = 25  # Limit per feed per run (cap to balance sources)
     days_to_keep: int = 90  # How long to retain articles (free-tier storage limit)
     update_interval_hours: int = 6  # How often to check for new articles
+    # Extracted article page text, reused across runs ("" disables caching)
+    content_cache_path: str = "./data/content_cache.sqlite"
+    content_cache_ttl_hours: int = 24
+    # Last body + ETag/Last-Modified per feed, for conditional GETs ("" disables)
+    feed_cache_path: str = "./data/feed_cache.sqlite"
     
 INGESTION_CONFIG = IngestionConfig()
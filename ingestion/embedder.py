@@ -7,11 +7,18 @@ This module handles:
 - Caching to avoid re-embedding
 """
 
+import asyncio
+import base64
+import hashlib
 import logging
-import time
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from dataclasses import dataclass
 
+import numpy as np
+
 from config import EMBEDDING_CONFIG, API_CONFIG
 
 # Set up logging
@@ -29,7 +36,7 @@ class EmbeddedChunk:
     article_id: str
     chunk_index: int
     text: str
-    embedding: list[float]
+    embedding: np.ndarray  # float32, EMBEDDING_CONFIG.dimensions long
     
     # Metadata
     article_title: str
@@ -45,7 +52,7 @@ class EmbeddedChunk:
             "article_id": self.article_id,
             "chunk_index": self.chunk_index,
             "text": self.text,
-            "embedding": self.embedding,
+            "embedding": self.embedding.tolist(),
             "article_title": self.article_title,
             "article_url": self.article_url,
             "source_name": self.source_name,
@@ -54,6 +61,73 @@ class EmbeddedChunk:
         }
 
 
+# =============================================================================
+# EMBEDDING CACHE
+# =============================================================================
+
+class EmbeddingCache:
+    """
+    On-disk cache of SHA-256(text) -> embedding, backed by SQLite.
+    
+    Entries are keyed by (text hash, model) so switching embedding models
+    never serves stale vectors. Embeddings are stored as float32 bytes.
+    """
+    
+    # SQLite's default limit on bound parameters is 999
+    _LOOKUP_BATCH = 500
+    
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                text_sha256 BLOB NOT NULL,
+                model TEXT NOT NULL,
+                dims INTEGER NOT NULL,
+                embedding BLOB NOT NULL,
+                PRIMARY KEY (text_sha256, model)
+            )
+            """
+        )
+    
+    @staticmethod
+    def key(text: str) -> bytes:
+        """Cache key for a text."""
+        return hashlib.sha256(text.encode()).digest()
+    
+    def get_many(self, keys: list[bytes], model: str) -> dict[bytes, np.ndarray]:
+        """Return {key: embedding} for every key present in the cache."""
+        found = {}
+        unique_keys = list(set(keys))
+        for i in range(0, len(unique_keys), self._LOOKUP_BATCH):
+            batch = unique_keys[i:i + self._LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT text_sha256, embedding FROM embeddings "
+                f"WHERE model = ? AND text_sha256 IN ({placeholders})",
+                [model, *batch],
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+    
+    def put_many(self, items: list[tuple[bytes, np.ndarray]], model: str):
+        """Store (key, embedding) pairs, replacing existing entries."""
+        if not items:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (text_sha256, model, dims, embedding) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (key, model, len(embedding), np.asarray(embedding, dtype=np.float32).tobytes())
+                    for key, embedding in items
+                ],
+            )
+
+
 # =============================================================================
 # EMBEDDING GENERATION
 # =============================================================================
@@ -62,22 +136,29 @@ class Embedder:
     """
     Handles embedding generation using OpenAI's API.
     
+    Texts already embedded with the same model are served from an on-disk
+    EmbeddingCache, so periodic runs only pay for new or changed chunks.
+    
     Usage:
         embedder = Embedder()
         embedded_chunks = embedder.embed_chunks(chunks)
     """
     
-    def __init__(self, api_key: str = None, model: str = None):
+    def __init__(self, api_key: str = None, model: str = None, cache_path: str = None):
         """
         Initialize the embedder.
         
         Args:
             api_key: OpenAI API key (default from config)
             model: Embedding model to use (default from config)
+            cache_path: SQLite embedding cache file (default from config;
+                        empty string disables caching)
         """
         self.api_key = api_key or API_CONFIG.openai_key
         self.model = model or EMBEDDING_CONFIG.model
+        self.cache_path = EMBEDDING_CONFIG.cache_path if cache_path is None else cache_path
         self.client = None
+        self.cache = None
         
         if not self.api_key:
             logger.warning("No OpenAI API key configured. Set OPENAI_API_KEY environment variable.")
@@ -92,6 +173,12 @@ class Embedder:
                 raise ImportError("Please install openai: pip install openai")
         return self.client
     
+    def _get_cache(self) -> Optional[EmbeddingCache]:
+        """Lazy initialization of the embedding cache (None if disabled)."""
+        if self.cache is None and self.cache_path:
+            self.cache = EmbeddingCache(self.cache_path)
+        return self.cache
+    
     def embed_text(self, text: str) -> list[float]:
         """
         Generate embedding for a single text.
@@ -116,50 +203,123 @@ class Embedder:
         texts: list[str], 
         batch_size: int = None,
         show_progress: bool = True,
-    ) -> list[list[float]]:
+    ) -> list[Optional[np.ndarray]]:
         """
         Generate embeddings for multiple texts in batches.
         
+        Cached texts are served from disk and duplicate texts are sent only
+        once; the rest are sent concurrently (up to
+        EMBEDDING_CONFIG.concurrency requests in flight) and reassembled in
+        input order.
+        
+        Safe to call from inside a running event loop (a notebook, an async
+        caller): the requests then run on a worker thread's own loop, and
+        the call blocks until they finish like any other sync call.
+        
         Args:
             texts: List of texts to embed
             batch_size: Number of texts per API call (default from config)
             show_progress: Whether to log progress
         
         Returns:
-            List of embedding vectors
+            List of float32 embedding vectors (None where embedding failed)
         """
-        batch_size = batch_size or EMBEDDING_CONFIG.batch_size
-        client = self._get_client()
+        cache = self._get_cache()
+        keys = [EmbeddingCache.key(text) for text in texts]
+        cached = cache.get_many(keys, self.model) if cache else {}
         
-        all_embeddings = []
-        total_batches = (len(texts) + batch_size - 1) // batch_size
-        
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            batch_num = i // batch_size + 1
-            
-            if show_progress:
-                logger.info(f"Embedding batch {batch_num}/{total_batches} ({len(batch)} texts)")
-            
+        # Unique uncached texts in first-seen order — duplicates (boilerplate,
+        # republished summaries) are embedded once and scattered back below
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in pending:
+                pending[key] = text
+        
+        if show_progress:
+            logger.info(
+                f"Embedding {len(pending)} unique texts "
+                f"({len(texts) - len(pending)} served from cache or duplicates)"
+            )
+        
+        fresh = {}
+        if pending:
+            embed = self._aembed_texts_batch(
+                list(pending.values()), batch_size=batch_size, show_progress=show_progress
+            )
             try:
-                response = client.embeddings.create(
-                    model=self.model,
-                    input=batch,
+                asyncio.get_running_loop()
+            except RuntimeError:
+                embeddings = asyncio.run(embed)
+            else:
+                # asyncio.run() can't nest inside the caller's loop
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    embeddings = pool.submit(asyncio.run, embed).result()
+            fresh = dict(zip(pending, embeddings))
+            if cache:
+                cache.put_many(
+                    [(key, emb) for key, emb in fresh.items() if emb is not None],
+                    self.model,
                 )
+        
+        return [cached[key] if key in cached else fresh[key] for key in keys]
+    
+    async def _aembed_texts_batch(
+        self,
+        texts: list[str],
+        batch_size: int = None,
+        show_progress: bool = True,
+        concurrency: int = None,
+    ) -> list[Optional[np.ndarray]]:
+        """
+        Async implementation of embed_texts_batch.
+        
+        The AsyncOpenAI client is scoped to this call: its connection pool is
+        bound to the running event loop, and each asyncio.run() gets a new one.
+        """
+        try:
+            from openai import AsyncOpenAI
+        except ImportError:
+            raise ImportError("Please install openai: pip install openai")
+        
+        batch_size = batch_size or EMBEDDING_CONFIG.batch_size
+        concurrency = concurrency or EMBEDDING_CONFIG.concurrency
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        total_batches = len(batches)
+        
+        async def embed_one(batch_num: int, batch: list[str]) -> list:
+            async with semaphore:
+                if show_progress:
+                    logger.info(f"Embedding batch {batch_num}/{total_batches} ({len(batch)} texts)")
                 
-                # Extract embeddings in order
-                batch_embeddings = [item.embedding for item in response.data]
-                all_embeddings.extend(batch_embeddings)
+                try:
+                    # base64 transports raw float32 bytes: smaller than JSON floats
+                    # and decoded straight into arrays
+                    response = await client.embeddings.create(
+                        model=self.model,
+                        input=batch,
+                        encoding_format="base64",
+                    )
+                    # Extract embeddings in order
+                    return [
+                        np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32)
+                        for item in response.data
+                    ]
                 
-            except Exception as e:
-                logger.error(f"Error embedding batch {batch_num}: {e}")
-                # Return None embeddings for failed batch
-                all_embeddings.extend([None] * len(batch))
-            
-            # Small delay to respect rate limits
-            if i + batch_size < len(texts):
-                time.sleep(0.1)
+                except Exception as e:
+                    logger.error(f"Error embedding batch {batch_num}: {e}")
+                    # Return None embeddings for failed batch
+                    return [None] * len(batch)
         
+        async with AsyncOpenAI(api_key=self.api_key) as client:
+            results = await asyncio.gather(
+                *(embed_one(n, batch) for n, batch in enumerate(batches, 1))
+            )
+        
+        all_embeddings = []
+        for batch_embeddings in results:
+            all_embeddings.extend(batch_embeddings)
         return all_embeddings
     
     def embed_chunks(self, chunks: list) -> list[EmbeddedChunk]:
@@ -218,39 +378,43 @@ class MockEmbedder:
     
     def __init__(self, dimensions: int = None):
         self.dimensions = dimensions or EMBEDDING_CONFIG.dimensions
+        # Which hash byte feeds each dimension (the 32-byte digest repeats)
+        self._hash_index = np.arange(self.dimensions) % 32
     
     def embed_text(self, text: str) -> list[float]:
         """Generate a mock embedding based on text hash."""
-        import hashlib
-        import struct
-        
         # Use hash of text to generate deterministic "embedding"
-        hash_bytes = hashlib.sha256(text.encode()).digest()
+        hash_bytes = np.frombuffer(hashlib.sha256(text.encode()).digest(), dtype=np.uint8)
         
         # Expand hash to fill embedding dimensions
-        embedding = []
-        for i in range(self.dimensions):
-            # Use different parts of hash with index
-            idx = i % 32
-            value = hash_bytes[idx] / 255.0 - 0.5
-            embedding.append(value)
+        embedding = hash_bytes[self._hash_index] / 255.0 - 0.5
         
         # Normalize
-        magnitude = sum(x**2 for x in embedding) ** 0.5
-        embedding = [x / magnitude for x in embedding]
+        embedding /= np.linalg.norm(embedding)
         
-        return embedding
+        return embedding.tolist()
     
-    def embed_texts_batch(self, texts: list[str], **kwargs) -> list[list[float]]:
-        """Generate mock embeddings for multiple texts."""
-        return [self.embed_text(text) for text in texts]
+    def embed_texts_batch(self, texts: list[str], **kwargs) -> list[np.ndarray]:
+        """Generate mock embeddings for multiple texts as one (N, dims) matrix."""
+        if not texts:
+            return []
+        
+        digests = np.frombuffer(
+            b"".join(hashlib.sha256(text.encode()).digest() for text in texts),
+            dtype=np.uint8,
+        ).reshape(len(texts), 32)
+        
+        matrix = digests[:, self._hash_index] / 255.0 - 0.5
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        
+        return list(np.ascontiguousarray(matrix, dtype=np.float32))
     
     def embed_chunks(self, chunks: list) -> list[EmbeddedChunk]:
         """Generate mock embeddings for chunks."""
         embedded_chunks = []
+        embeddings = self.embed_texts_batch([chunk.text for chunk in chunks])
         
-        for chunk in chunks:
-            embedding = self.embed_text(chunk.text)
+        for chunk, embedding in zip(chunks, embeddings):
             embedded_chunk = EmbeddedChunk(
                 chunk_id=chunk.id,
                 article_id=chunk.article_id,
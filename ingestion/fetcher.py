@@ -8,18 +8,33 @@ This module handles:
 - Handling errors and retries gracefully
 """
 
+import asyncio
+import codecs
+import email.utils
+import functools
 import hashlib
+import heapq
 import logging
+import os
+import re
+import sqlite3
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Optional, Sequence
 from urllib.parse import urlparse
+from xml.sax.saxutils import escape as xml_escape
 
+import ahocorasick
 import feedparser
-import requests
-from bs4 import BeautifulSoup
+import httpx
+import lxml.html
+from bs4.dammit import EncodingDetector
+from lxml import etree
 
-from config import RSS_FEEDS, INGESTION_CONFIG
+from config import RSS_FEEDS, INGESTION_CONFIG, FeedSource
 from taxonomy import TAXONOMY
 
 # Set up logging
@@ -29,17 +44,163 @@ logger = logging.getLogger(__name__)
 # Minimum content length to consider an article "complete" from RSS alone
 MIN_RSS_CONTENT_LENGTH = 500
 
-# Build a flat set of all taxonomy terms (lowercase) for relevance scoring
+# Feed downloads and article page fetches run concurrently: at most
+# FEED_CONCURRENCY feeds and ARTICLE_CONCURRENCY pages at once overall, and
+# FEED_CONCURRENCY_PER_HOST requests against any single host
+FEED_CONCURRENCY = 10
+ARTICLE_CONCURRENCY = 16
+FEED_CONCURRENCY_PER_HOST = 4
+FEED_TIMEOUT = 15
+
+# Article pages are read at most this far: extraction keeps 15k chars of
+# text, and the rest of an oversized page is inline scripts/styles/data
+MAX_PAGE_BYTES = 1024 * 1024
+
+# Worker processes for parsing downloaded article pages (CPU-bound)
+PARSE_WORKERS = os.cpu_count() or 1
+
+# Connection failures (refused, reset, DNS hiccups) are retried this many
+# times by the transport before a request is given up on
+HTTP_RETRIES = 2
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
+                  'AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/120.0.0.0 Safari/537.36'
+}
+
+# Shared client for article page fetches: keeps connections (and HTTP/2
+# sessions) alive across the many requests that hit the same few publishers
+_http_client: Optional[httpx.Client] = None
+
+
+def get_http_client() -> httpx.Client:
+    """Lazily create the process-wide pooled HTTP client."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            headers=HEADERS,
+            follow_redirects=True,
+            transport=httpx.HTTPTransport(
+                http2=True,
+                retries=HTTP_RETRIES,
+                limits=httpx.Limits(max_keepalive_connections=20),
+            ),
+        )
+    return _http_client
+
+# Class names marking page chrome (sidebars, share bars, cookie banners, ...)
+# that is stripped before article text is extracted
+_BAD_CLASS_RE = re.compile(
+    r'sidebar|comment|social|share|related|newsletter|subscribe|'
+    r'advertisement|promo|cookie|popup|modal|menu|breadcrumb',
+    re.IGNORECASE,
+)
+
+# Precompiled XPath for article extraction (see extract_article_content)
+_UNWANTED_ELEMENTS = etree.XPath(
+    '//script | //style | //nav | //header | //footer | //aside | //form'
+    ' | //iframe | //noscript | //figure | //figcaption'
+)
+_BAD_CLASS_ELEMENTS = etree.XPath(
+    f'//*[re:test(@class, "{_BAD_CLASS_RE.pattern}", "i")]',
+    namespaces={'re': 'http://exslt.org/regular-expressions'},
+)
+_TEXT_NODES = etree.XPath('.//text()[not(ancestor::template)]')
+_BODY = etree.XPath('//body')
+
+
+def _div_with_class(name: str) -> str:
+    """XPath for the first <div> whose class list contains name."""
+    return f"(//div[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')])[1]"
+
+
+_ARTICLE = '(//article)[1]'
+_MAIN = '(//main)[1]'
+
+# Main-content cascade for RSS-inlined HTML (see extract_content_from_html)
+_SNIPPET_UNWANTED_ELEMENTS = etree.XPath(
+    '//script | //style | //nav | //header | //footer | //aside | //form'
+    ' | //iframe | //noscript'
+)
+_SNIPPET_SELECTORS = tuple(etree.XPath(x) for x in (
+    _ARTICLE,
+    _MAIN,
+    _div_with_class('content'),
+    _div_with_class('post'),
+    _div_with_class('entry'),
+    '//body',
+))
+
+# Known sources: registered domain -> site-specific XPaths tried in order
+_SITE_XPATHS = dict((
+        ('techcrunch.com', (_div_with_class('article-content'), _ARTICLE)),
+        ('theverge.com', (_div_with_class('duet--article--article-body-component'), _ARTICLE)),
+        ('technologyreview.com', (_div_with_class('body--content'), _ARTICLE)),
+        ('openai.com', (_div_with_class('ui-rich-text'), _ARTICLE, _MAIN)),
+        ('simonwillison.net', (_div_with_class('entry-content'), _ARTICLE)),
+        ('venturebeat.com', (_div_with_class('article-content'), _ARTICLE)),
+        ('marktechpost.com', (_div_with_class('entry-content'), _ARTICLE)),
+        ('nvidia.com', (_div_with_class('entry-content'), _ARTICLE)),
+        ('microsoft.com', (_div_with_class('entry-content'), _ARTICLE)),
+        # Hacker News links
+        ('ycombinator.com', (_ARTICLE, _MAIN)),
+        # Substack (Import AI, AI Snake Oil, etc.)
+        ('substack.com', (_div_with_class('body'), _div_with_class('post-content'), _ARTICLE)),
+        ('wired.com', (_div_with_class('body__inner-container'), _ARTICLE)),
+        ('thegradient.pub', (_div_with_class('post-content'), _ARTICLE)),
+        ('reuters.com', (_div_with_class('article-body__content'), _ARTICLE)),
+))
+
+_GENERIC_XPATHS = (
+    _ARTICLE,
+    _div_with_class('article-content'),
+    _div_with_class('article-body'),
+    _div_with_class('post-content'),
+    _div_with_class('entry-content'),
+    _div_with_class('content-body'),
+    "(//div[@role='article'])[1]",
+    _MAIN,
+    _div_with_class('content'),
+)
+
+_GENERIC_SELECTORS = tuple(etree.XPath(x) for x in _GENERIC_XPATHS)
+
+# Full selector chain per known domain (site-specific, then generic),
+# compiled once so extraction only does a dict lookup
+_SITE_SELECTORS = {
+    site: tuple(etree.XPath(x) for x in (*xpaths, *_GENERIC_XPATHS))
+    for site, xpaths in _SITE_XPATHS.items()
+}
+
+
+def _selectors_for(domain: str) -> tuple[etree.XPath, ...]:
+    """Selector chain for a host, matching it or any parent domain."""
+    while True:
+        selectors = _SITE_SELECTORS.get(domain)
+        if selectors is not None:
+            return selectors
+        if '.' not in domain:
+            return _GENERIC_SELECTORS
+        domain = domain.split('.', 1)[1]
+
+# Build a flat set of all taxonomy terms (lowercase) for relevance scoring,
+# compiled into one Aho-Corasick automaton that finds them all in one pass
 _RELEVANCE_TERMS: set[str] = set()
 for _synonyms in TAXONOMY.values():
     for _term in _synonyms:
         _RELEVANCE_TERMS.add(_term.lower())
 
+_RELEVANCE_AUTOMATON = ahocorasick.Automaton()
+for _term in _RELEVANCE_TERMS:
+    _RELEVANCE_AUTOMATON.add_word(_term, _term)
+_RELEVANCE_AUTOMATON.make_automaton()
+
 # =============================================================================
 # DATA STRUCTURES
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Article:
     """Standardized article structure."""
     id: str  # Unique hash of URL
@@ -76,161 +237,285 @@ class Article:
 
 
 def generate_article_id(url: str) -> str:
-    """Generate a unique ID for an article based on its URL."""
+    """
+    Generate a unique ID for an article based on its URL.
+
+    The ID is the primary key of stored articles and is what new fetches are
+    deduplicated against, so the hash must not change without migrating
+    articles.id and chunks.article_id.
+    """
     return hashlib.sha256(url.encode()).hexdigest()[:16]
 
 
+# =============================================================================
+# PAGE CONTENT CACHE
+# =============================================================================
+
+class ContentCache:
+    """
+    On-disk cache of article ID -> extracted page text, backed by SQLite.
+
+    Feeds keep listing the same links for days, so pages extracted on an
+    earlier run are reused instead of being downloaded and parsed again.
+    Entries older than ttl_hours are treated as missing and refetched.
+    """
+
+    # SQLite's default limit on bound parameters is 999
+    _LOOKUP_BATCH = 500
+
+    def __init__(self, path: str, ttl_hours: float):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS page_content (
+                article_id TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get_many(self, article_ids: list[str]) -> dict[str, str]:
+        """Return {article_id: content} for every fresh entry in the cache."""
+        found = {}
+        unique_ids = list(set(article_ids))
+        oldest = time.time() - self.ttl_seconds
+        for i in range(0, len(unique_ids), self._LOOKUP_BATCH):
+            batch = unique_ids[i:i + self._LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT article_id, content FROM page_content "
+                f"WHERE fetched_at >= ? AND article_id IN ({placeholders})",
+                [oldest, *batch],
+            )
+            found.update(rows)
+        return found
+
+    def put_many(self, items: list[tuple[str, str]]):
+        """Store (article_id, content) pairs, replacing existing entries."""
+        if not items:
+            return
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO page_content (article_id, content, fetched_at) "
+                "VALUES (?, ?, ?)",
+                [(article_id, content, now) for article_id, content in items],
+            )
+
+
+_content_cache: Optional[ContentCache] = None
+
+
+def get_content_cache() -> Optional[ContentCache]:
+    """Lazily open the process-wide page content cache (None if disabled)."""
+    global _content_cache
+    if _content_cache is None and INGESTION_CONFIG.content_cache_path:
+        _content_cache = ContentCache(
+            INGESTION_CONFIG.content_cache_path,
+            INGESTION_CONFIG.content_cache_ttl_hours,
+        )
+    return _content_cache
+
+
+class FeedCache:
+    """
+    On-disk cache of feed URL -> last downloaded body and its validators.
+
+    The next run sends them back as If-None-Match / If-Modified-Since; when
+    the server answers 304 Not Modified, the stored body is parsed instead
+    of downloading the feed again.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS feed_body (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT NOT NULL,
+                body BLOB NOT NULL
+            )
+            """
+        )
+
+    def get(self, url: str) -> Optional[tuple[Optional[str], Optional[str], str, bytes]]:
+        """Return (etag, last_modified, content_type, body) for url, if stored."""
+        return self.conn.execute(
+            "SELECT etag, last_modified, content_type, body FROM feed_body WHERE url = ?",
+            (url,),
+        ).fetchone()
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str],
+            content_type: str, body: bytes):
+        """Store a feed body; bodies without any validator are not kept."""
+        with self.conn:
+            if etag is None and last_modified is None:
+                self.conn.execute("DELETE FROM feed_body WHERE url = ?", (url,))
+                return
+            self.conn.execute(
+                "INSERT OR REPLACE INTO feed_body (url, etag, last_modified, content_type, body) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_type, body),
+            )
+
+
+_feed_cache: Optional[FeedCache] = None
+
+
+def get_feed_cache() -> Optional[FeedCache]:
+    """Lazily open the process-wide feed cache (None if disabled)."""
+    global _feed_cache
+    if _feed_cache is None and INGESTION_CONFIG.feed_cache_path:
+        _feed_cache = FeedCache(INGESTION_CONFIG.feed_cache_path)
+    return _feed_cache
+
+
 # =============================================================================
 # CONTENT EXTRACTION
 # =============================================================================
 
+def _normalize_lines(text: str) -> str:
+    """Strip every line and drop blank ones (one C-level pass per step)."""
+    return '\n'.join(filter(None, map(str.strip, text.splitlines())))
+
+
 def extract_content_from_html(html: str) -> str:
     """
     Extract clean text content from HTML.
 
-    Uses BeautifulSoup to:
+    Uses lxml with precompiled XPath to:
     - Remove scripts, styles, and navigation
     - Extract main content
     - Clean up whitespace
+
+    Plain text (common for Atom summaries) skips the parse entirely.
     """
-    soup = BeautifulSoup(html, 'html.parser')
+    # Only markup, entities, NULs and a leading BOM are changed by parsing;
+    # anything else comes out of the parser exactly as it went in
+    if ('<' not in html and '&' not in html and '\x00' not in html
+            and not html.startswith('\ufeff')):
+        return _normalize_lines(html)
+
+    try:
+        # A leading BOM is markup noise (libxml2 would keep it once encoded)
+        tree = lxml.html.document_fromstring(
+            html.removeprefix('\ufeff').encode('utf-8', 'surrogatepass'),
+            parser=_html_parser('utf-8'),
+        )
+    except etree.ParserError:
+        # Nothing but comments/whitespace
+        return ''
 
     # Remove unwanted elements
-    for element in soup(['script', 'style', 'nav', 'header', 'footer',
-                         'aside', 'form', 'iframe', 'noscript']):
-        element.decompose()
-
-    # Try to find main content area
-    main_content = (
-        soup.find('article') or
-        soup.find('main') or
-        soup.find('div', class_='content') or
-        soup.find('div', class_='post') or
-        soup.find('div', class_='entry') or
-        soup.body or
-        soup
-    )
+    for element in _SNIPPET_UNWANTED_ELEMENTS(tree):
+        _blank_out(element)
+
+    # Try to find main content area (whole document as a last resort)
+    main_content = next((found[0] for selector in _SNIPPET_SELECTORS if (found := selector(tree))), tree)
 
     # Get text and clean whitespace
-    text = main_content.get_text(separator=' ', strip=True)
+    text = ' '.join(filter(None, map(str.strip, _TEXT_NODES(main_content))))
 
     # Normalize whitespace
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-    text = '\n'.join(lines)
+    text = _normalize_lines(text)
 
     return text
 
 
-def fetch_full_content(url: str, timeout: int = 15) -> Optional[str]:
+def _page_encoding(html: bytes, encoding: Optional[str]) -> str:
     """
-    Fetch and extract full article content from a URL.
+    Pick the charset to decode a page with.
+
+    Header charset first, then the page's own <meta charset>, then UTF-8 if
+    the bytes decode as such, else windows-1252 — libxml2 on its own would
+    read undeclared UTF-8 as latin-1.
+    """
+    for candidate in (encoding, EncodingDetector.find_declared_encoding(html, is_html=True)):
+        if candidate:
+            try:
+                return codecs.lookup(candidate).name
+            except LookupError:
+                pass
+    try:
+        html.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'windows-1252'
+
+
+@functools.cache
+def _html_parser(encoding: str) -> lxml.html.HTMLParser:
+    """One reusable lxml HTML parser per charset."""
+    return lxml.html.HTMLParser(encoding=encoding)
+
+
+def _blank_out(element: etree._Element) -> None:
+    """
+    Remove an element and its subtree, keeping its tail text.
+
+    The element is swapped for an empty comment rather than dropped so the
+    text on either side stays as separate strings instead of being glued
+    together.
+    """
+    parent = element.getparent()
+    if parent is None:
+        return
+    placeholder = etree.Comment()
+    placeholder.tail = element.tail
+    parent.replace(element, placeholder)
+
+
+def extract_article_content(html: bytes, url: str, encoding: Optional[str] = None) -> Optional[str]:
+    """
+    Extract the main article text from a downloaded page.
 
     Uses site-specific selectors for known sources, then falls back
-    to generic article/main content extraction.
+    to generic article/main content extraction. Parsing and every selector
+    run in lxml/libxml2 with precompiled XPath.
 
-    Returns None if fetching fails.
+    Args:
+        html: Raw page bytes (lets the parser honour the page's <meta charset>)
+        url: Page URL, used to pick site-specific selectors
+        encoding: Charset from the HTTP headers, if any (takes precedence)
+
+    Returns None if no usable content is found.
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
-                          'AppleWebKit/537.36 (KHTML, like Gecko) '
-                          'Chrome/120.0.0.0 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=timeout)
-        response.raise_for_status()
+        if not html.strip():
+            return None
+        tree = lxml.html.document_fromstring(html, parser=_html_parser(_page_encoding(html, encoding)))
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Remove unwanted elements
-        for element in soup(['script', 'style', 'nav', 'header', 'footer',
-                             'aside', 'form', 'iframe', 'noscript',
-                             'figure', 'figcaption']):
-            element.decompose()
-
-        # Remove common non-content elements by class/id patterns
-        for element in soup.find_all(class_=lambda c: c and any(
-            x in str(c).lower() for x in [
-                'sidebar', 'comment', 'social', 'share', 'related',
-                'newsletter', 'subscribe', 'advertisement', 'promo',
-                'cookie', 'popup', 'modal', 'menu', 'breadcrumb',
-            ]
-        )):
-            element.decompose()
-
-        # Try site-specific selectors first
-        domain = urlparse(url).netloc.lower()
-        article = None
+        # Remove unwanted elements, then common non-content elements by class
+        for element in _UNWANTED_ELEMENTS(tree):
+            _blank_out(element)
+        for element in _BAD_CLASS_ELEMENTS(tree):
+            _blank_out(element)
 
-        # TechCrunch
-        if 'techcrunch.com' in domain:
-            article = soup.find('div', class_='article-content') or soup.find('article')
-        # The Verge
-        elif 'theverge.com' in domain:
-            article = soup.find('div', class_='duet--article--article-body-component') or soup.find('article')
-        # MIT Technology Review
-        elif 'technologyreview.com' in domain:
-            article = soup.find('div', class_='body--content') or soup.find('article')
-        # OpenAI Blog
-        elif 'openai.com' in domain:
-            article = soup.find('div', class_='ui-rich-text') or soup.find('article') or soup.find('main')
-        # Simon Willison
-        elif 'simonwillison.net' in domain:
-            article = soup.find('div', class_='entry-content') or soup.find('article')
-        # VentureBeat
-        elif 'venturebeat.com' in domain:
-            article = soup.find('div', class_='article-content') or soup.find('article')
-        # MarkTechPost
-        elif 'marktechpost.com' in domain:
-            article = soup.find('div', class_='entry-content') or soup.find('article')
-        # Nvidia
-        elif 'nvidia.com' in domain:
-            article = soup.find('div', class_='entry-content') or soup.find('article')
-        # Microsoft
-        elif 'microsoft.com' in domain or 'blogs.microsoft.com' in domain:
-            article = soup.find('div', class_='entry-content') or soup.find('article')
-        # Hacker News links
-        elif 'ycombinator.com' in domain:
-            article = soup.find('article') or soup.find('main')
-        # Substack (Import AI, AI Snake Oil, etc.)
-        elif 'substack.com' in domain:
-            article = soup.find('div', class_='body') or soup.find('div', class_='post-content') or soup.find('article')
-        # Wired
-        elif 'wired.com' in domain:
-            article = soup.find('div', class_='body__inner-container') or soup.find('article')
-        # The Gradient
-        elif 'thegradient.pub' in domain:
-            article = soup.find('div', class_='post-content') or soup.find('article')
-        # Reuters
-        elif 'reuters.com' in domain:
-            article = soup.find('div', class_='article-body__content') or soup.find('article')
-
-        # Generic fallback selectors
-        if not article:
-            article = (
-                soup.find('article') or
-                soup.find('div', class_='article-content') or
-                soup.find('div', class_='article-body') or
-                soup.find('div', class_='post-content') or
-                soup.find('div', class_='entry-content') or
-                soup.find('div', class_='content-body') or
-                soup.find('div', {'role': 'article'}) or
-                soup.find('main') or
-                soup.find('div', class_='content')
-            )
+        # Try site-specific selectors first, then the generic fallbacks
+        article = None
+        for selector in _selectors_for((urlparse(url).hostname or '').rstrip('.')):
+            found = selector(tree)
+            if found:
+                article = found[0]
+                break
 
-        if article:
-            text = article.get_text(separator='\n', strip=True)
-        else:
+        if article is None:
             # Last resort: get body text
-            body = soup.find('body')
-            if body:
-                text = body.get_text(separator='\n', strip=True)
-            else:
+            body = _BODY(tree)
+            if not body:
                 return None
+            article = body[0]
 
-        # Clean up extracted text
-        lines = [line.strip() for line in text.splitlines() if line.strip()]
-        text = '\n'.join(lines)
+        # One text node per line, then clean up the lines
+        text = _normalize_lines('\n'.join(_TEXT_NODES(article)))
 
         # Limit to reasonable length (some pages have tons of boilerplate)
         if len(text) > 15000:
@@ -238,18 +523,202 @@ def fetch_full_content(url: str, timeout: int = 15) -> Optional[str]:
 
         return text if len(text) > 100 else None
 
-    except requests.RequestException as e:
-        logger.warning(f"Failed to fetch full content from {url}: {e}")
-        return None
     except Exception as e:
         logger.warning(f"Error extracting content from {url}: {e}")
         return None
 
 
+def fetch_full_content(url: str, timeout: int = 15) -> Optional[str]:
+    """
+    Fetch and extract full article content from a URL.
+
+    Pages fetched within the content cache's TTL are served from it.
+    Returns None if fetching fails.
+    """
+    cache = get_content_cache()
+    article_id = generate_article_id(url)
+    if cache:
+        cached = cache.get_many([article_id])
+        if article_id in cached:
+            return cached[article_id]
+
+    try:
+        with get_http_client().stream('GET', url, timeout=timeout) as response:
+            response.raise_for_status()
+            html = bytearray()
+            for chunk in response.iter_bytes():
+                html += chunk
+                if len(html) >= MAX_PAGE_BYTES:
+                    break
+            encoding = response.charset_encoding
+    except Exception as e:
+        logger.warning(f"Failed to fetch full content from {url}: {e}")
+        return None
+
+    text = extract_article_content(bytes(html[:MAX_PAGE_BYTES]), url, encoding)
+    if cache and text:
+        cache.put_many([(article_id, text)])
+    return text
+
+
 # =============================================================================
 # RSS FEED PARSING
 # =============================================================================
 
+# Namespaces for the lxml feed parser
+_ATOM_NS = 'http://www.w3.org/2005/Atom'
+_RSS1_NS = 'http://purl.org/rss/1.0/'
+_RDF_NS = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#'
+_DC_NS = 'http://purl.org/dc/elements/1.1/'
+_CONTENT_NS = 'http://purl.org/rss/1.0/modules/content/'
+
+# Strict XML: anything not well-formed is left to feedparser's loose parser
+_FEED_XML_PARSER = etree.XMLParser(resolve_entities=False, no_network=True)
+
+_ATOM_LINK_TYPES = ('text/html', 'application/xhtml+xml')
+
+
+def _parse_feed_date(value: str) -> Optional[time.struct_time]:
+    """Parse an RFC 822 or ISO 8601 feed date as a UTC struct_time."""
+    try:
+        dt = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.timetuple()
+
+
+def _xml_text(element: etree._Element) -> str:
+    """An element's text content (CDATA included, comments dropped), stripped."""
+    return ''.join(element.itertext()).strip()
+
+
+def _atom_text(element: etree._Element) -> str:
+    """
+    An Atom text construct as HTML/text source, the way feedparser gives it:
+    type="xhtml" content is serialized from inside its wrapper <div>.
+    """
+    if element.get('type') != 'xhtml':
+        return ''.join(element.itertext())
+    div = next(iter(element), None)
+    if div is None:
+        return ''
+    return xml_escape(div.text or '') + ''.join(
+        etree.tostring(child, encoding='unicode', with_tail=True) for child in div
+    )
+
+
+def _add_tag(entry: dict, term: Optional[str], scheme: Optional[str] = None, label: Optional[str] = None) -> None:
+    """Append a category to entry['tags'], skipping blanks and exact repeats."""
+    if term:
+        tag = {'term': term, 'scheme': scheme, 'label': label}
+        tags = entry.setdefault('tags', [])
+        if tag not in tags:
+            tags.append(tag)
+
+
+def _rss_entry(item: etree._Element) -> dict:
+    """Convert an RSS 2.0 / RSS 1.0 <item> into a feedparser-shaped entry."""
+    entry = {}
+    guid_link = None
+    for child in item:
+        tag = child.tag
+        if not isinstance(tag, str):
+            continue  # comments / processing instructions
+        tag = tag.replace('{' + _RSS1_NS + '}', '')
+        if tag == 'title':
+            entry['title'] = _xml_text(child)
+        elif tag == 'link':
+            entry['link'] = _xml_text(child)
+        elif tag == 'description':
+            entry['summary'] = _xml_text(child)
+        elif tag == '{%s}encoded' % _CONTENT_NS:
+            entry.setdefault('content', [{'value': _xml_text(child)}])
+        elif tag in ('author', '{%s}creator' % _DC_NS, '{%s}author' % _DC_NS):
+            entry['author'] = _xml_text(child)
+        elif tag in ('category', '{%s}subject' % _DC_NS):
+            _add_tag(entry, _xml_text(child), child.get('domain'))
+        elif tag == 'pubDate':
+            entry['published_parsed'] = _parse_feed_date(_xml_text(child))
+        elif tag == '{%s}date' % _DC_NS:
+            entry['updated_parsed'] = _parse_feed_date(_xml_text(child))
+        elif tag == 'guid' and child.get('isPermaLink', 'true') != 'false':
+            guid_link = _xml_text(child)
+
+    if 'link' not in entry and guid_link:
+        entry['link'] = guid_link
+    if 'summary' not in entry and 'content' in entry:
+        entry['summary'] = entry['content'][0]['value']
+    return entry
+
+
+def _atom_entry(element: etree._Element) -> dict:
+    """Convert an Atom 1.0 <entry> into a feedparser-shaped entry."""
+    entry = {}
+    for child in element:
+        tag = child.tag
+        if not isinstance(tag, str) or not tag.startswith('{' + _ATOM_NS + '}'):
+            continue
+        tag = tag[len(_ATOM_NS) + 2:]
+        if tag == 'title':
+            entry['title'] = _atom_text(child).strip()
+        elif tag == 'link':
+            # The last alternate HTML link is the article's URL
+            if (child.get('rel', 'alternate') == 'alternate'
+                    and child.get('type', 'text/html') in _ATOM_LINK_TYPES):
+                entry['link'] = child.get('href', '')
+        elif tag == 'summary':
+            entry['summary'] = _atom_text(child).strip()
+        elif tag == 'content':
+            entry.setdefault('content', [{'value': _atom_text(child).strip()}])
+        elif tag == 'author':
+            name = child.findtext('{%s}name' % _ATOM_NS, '').strip()
+            addr = child.findtext('{%s}email' % _ATOM_NS, '').strip()
+            author = f"{name} ({addr})" if name and addr else name or addr
+            if author:
+                entry['author'] = author
+        elif tag == 'category':
+            _add_tag(entry, child.get('term'), child.get('scheme'), child.get('label'))
+        elif tag == 'published':
+            entry['published_parsed'] = _parse_feed_date(_xml_text(child))
+        elif tag == 'updated':
+            entry['updated_parsed'] = _parse_feed_date(_xml_text(child))
+
+    if 'summary' not in entry and 'content' in entry:
+        entry['summary'] = entry['content'][0]['value']
+    return entry
+
+
+def _parse_feed_lxml(body: bytes) -> Optional[list[dict]]:
+    """
+    Parse an RSS 2.0, RSS 1.0 or Atom 1.0 document with lxml.
+
+    Returns entries shaped like feedparser's (the keys parse_feed_entry
+    reads), or None if the body is not well-formed XML in one of those
+    formats so the caller can fall back to feedparser.
+    """
+    try:
+        root = etree.fromstring(body, parser=_FEED_XML_PARSER)
+    except etree.XMLSyntaxError:
+        return None
+
+    # A DTD can declare entities we deliberately don't resolve
+    if root.getroottree().docinfo.doctype:
+        return None
+
+    if root.tag == '{%s}feed' % _ATOM_NS:
+        return [_atom_entry(e) for e in root.iterchildren('{%s}entry' % _ATOM_NS)]
+    if root.tag == 'rss':
+        return [_rss_entry(item) for item in root.iterfind('channel/item')]
+    if root.tag == '{%s}RDF' % _RDF_NS:
+        return [_rss_entry(item) for item in root.iterchildren('{%s}item' % _RSS1_NS)]
+    return None
+
+
 def parse_published_date(entry: dict) -> Optional[datetime]:
     """Parse the published date from a feed entry."""
     # feedparser provides parsed dates in 'published_parsed' or 'updated_parsed'
@@ -264,18 +733,13 @@ def parse_published_date(entry: dict) -> Optional[datetime]:
     return None
 
 
-def parse_feed_entry(entry: dict, source: dict, fetch_full: bool = True) -> Optional[Article]:
+def _parse_entry_metadata(entry: dict, source: FeedSource) -> Optional[tuple[Article, bool]]:
     """
-    Parse a single feed entry into an Article.
-
-    Args:
-        entry: The feedparser entry dict
-        source: The source configuration dict
-        fetch_full: Whether to fetch full article content from URL
-                    (defaults to True — most RSS feeds only provide summaries)
+    Build an Article from the feed entry alone, without any page fetch.
 
-    Returns:
-        Article object or None if parsing fails
+    Returns (article, summary_from_content) — the flag marks entries with no
+    RSS summary, whose summary must follow the content if it gets replaced —
+    or None if parsing fails.
     """
     try:
         url = entry.get('link', '')
@@ -299,16 +763,6 @@ def parse_feed_entry(entry: dict, source: dict, fetch_full: bool = True) -> Opti
         if len(content) < 200:
             content = summary
 
-        # Fetch full content from URL if RSS content is too short
-        if fetch_full and len(content) < MIN_RSS_CONTENT_LENGTH:
-            logger.info(f"  Content too short ({len(content)} chars), fetching from URL: {url[:80]}...")
-            full_content = fetch_full_content(url)
-            if full_content and len(full_content) > len(content):
-                logger.info(f"  → Got {len(full_content)} chars from URL (was {len(content)})")
-                content = full_content
-            else:
-                logger.info(f"  → URL fetch returned {'nothing' if not full_content else f'{len(full_content)} chars (not better)'}")
-
         # Extract authors
         authors = []
         if 'author' in entry:
@@ -321,25 +775,68 @@ def parse_feed_entry(entry: dict, source: dict, fetch_full: bool = True) -> Opti
         if 'tags' in entry:
             tags = [t.get('term', '') for t in entry['tags'] if t.get('term')]
 
-        return Article(
+        article = Article(
             id=generate_article_id(url),
             title=entry.get('title', 'Untitled'),
             url=url,
             content=content,
             summary=summary[:500] if summary else content[:500],
             published_at=parse_published_date(entry),
-            source_name=source['name'],
-            source_category=source['category'],
-            source_priority=source['priority'],
+            source_name=source.name,
+            source_category=source.category,
+            source_priority=source.priority,
             authors=authors,
             tags=tags,
         )
+        return article, not summary
 
     except Exception as e:
         logger.error(f"Failed to parse entry: {e}")
         return None
 
 
+def _needs_full_content(article: Article) -> bool:
+    """Whether the RSS content is too short and the page should be fetched."""
+    return len(article.content) < MIN_RSS_CONTENT_LENGTH
+
+
+def _apply_full_content(article: Article, full_content: Optional[str], summary_from_content: bool) -> None:
+    """Replace the article's RSS content with the fetched page text if it is longer."""
+    if full_content and len(full_content) > len(article.content):
+        logger.info(f"  → Got {len(full_content)} chars from URL (was {len(article.content)})")
+        article.content = full_content
+        if summary_from_content:
+            article.summary = full_content[:500]
+    else:
+        logger.info(f"  → URL fetch returned {'nothing' if not full_content else f'{len(full_content)} chars (not better)'}")
+
+
+def parse_feed_entry(entry: dict, source: FeedSource, fetch_full: bool = True) -> Optional[Article]:
+    """
+    Parse a single feed entry into an Article.
+
+    Args:
+        entry: The feedparser entry dict
+        source: The FeedSource configuration
+        fetch_full: Whether to fetch full article content from URL
+                    (defaults to True — most RSS feeds only provide summaries)
+
+    Returns:
+        Article object or None if parsing fails
+    """
+    parsed = _parse_entry_metadata(entry, source)
+    if parsed is None:
+        return None
+    article, summary_from_content = parsed
+
+    # Fetch full content from URL if RSS content is too short
+    if fetch_full and _needs_full_content(article):
+        logger.info(f"  Content too short ({len(article.content)} chars), fetching from URL: {article.url[:80]}...")
+        _apply_full_content(article, fetch_full_content(article.url), summary_from_content)
+
+    return article
+
+
 def _score_entry_relevance(entry: dict) -> int:
     """
     Score an RSS entry by relevance to our keyword taxonomy.
@@ -354,69 +851,310 @@ def _score_entry_relevance(entry: dict) -> int:
         + (entry.get("summary", "") or "")
     ).lower()
 
-    score = 0
-    for term in _RELEVANCE_TERMS:
-        if term in text:
-            score += 1
-    return score
+    return len({term for _, term in _RELEVANCE_AUTOMATON.iter(text)})
 
 
-def fetch_feed(source: dict, max_articles: int = None, fetch_full: bool = True) -> list[Article]:
+def _load_feed_entries(
+    source: FeedSource,
+    max_articles: int,
+    feed_body: Optional[bytes] = None,
+    feed_headers: Optional[dict] = None,
+) -> list[dict]:
+    """
+    Parse a feed and return at most max_articles of its entries.
+
+    When the feed has more entries than max_articles, entries are ranked
+    by relevance to our keyword taxonomy so we keep the most topical ones.
+    """
+    entries = _parse_feed_lxml(feed_body) if feed_body is not None else None
+
+    # Malformed or unusual feeds go through feedparser's forgiving parser
+    if entries is None:
+        if feed_body is not None:
+            feed = feedparser.parse(feed_body, response_headers=feed_headers)
+        else:
+            feed = feedparser.parse(source.url)
+
+        if feed.bozo and feed.bozo_exception:
+            logger.warning(f"Feed parsing warning for {source.name}: {feed.bozo_exception}")
+
+        entries = feed.entries
+
+    # If more entries than our cap, rank by relevance and keep the best
+    if len(entries) > max_articles:
+        logger.info(f"  {source.name} has {len(entries)} entries, selecting top {max_articles} by relevance")
+        # Same result as a stable descending sort cut to max_articles
+        entries = heapq.nlargest(max_articles, entries, key=_score_entry_relevance)
+
+    return entries
+
+
+def _keep_with_content(source: FeedSource, articles: list[Optional[Article]]) -> list[Article]:
+    """Drop entries that failed to parse or ended up with no content."""
+    kept = [a for a in articles if a and a.content]  # Only include articles with content
+
+    skipped_empty = len(articles) - len(kept)
+    if skipped_empty > 0:
+        logger.warning(f"  ⚠ Skipped {skipped_empty} entries with no content from {source.name}")
+
+    logger.info(f"Fetched {len(kept)} articles from {source.name}")
+    return kept
+
+
+def fetch_feed(
+    source: FeedSource,
+    max_articles: int = None,
+    fetch_full: bool = True,
+    feed_body: Optional[bytes] = None,
+    feed_headers: Optional[dict] = None,
+) -> list[Article]:
     """
     Fetch and parse articles from a single RSS feed.
 
     When the feed has more entries than max_articles, entries are ranked
     by relevance to our keyword taxonomy so we keep the most topical ones.
+    Full-content page fetches run one after another here; fetch_all_feeds
+    runs them concurrently instead.
 
     Args:
-        source: Source configuration dict with 'name', 'url', 'category', 'priority'
+        source: FeedSource with name, url, category and priority
         max_articles: Maximum articles to fetch (default from config)
         fetch_full: Whether to fetch full content from article URLs (default True)
+        feed_body: Already-downloaded feed XML (skips feedparser's own fetch)
+        feed_headers: HTTP response headers for feed_body (used for charset detection)
 
     Returns:
         List of Article objects
     """
     max_articles = max_articles or INGESTION_CONFIG.max_articles_per_feed
 
-    logger.info(f"Fetching feed: {source['name']}")
+    logger.info(f"Fetching feed: {source.name}")
 
     try:
-        feed = feedparser.parse(source['url'])
+        entries = _load_feed_entries(source, max_articles, feed_body, feed_headers)
+        articles = [parse_feed_entry(entry, source, fetch_full=fetch_full) for entry in entries]
+        return _keep_with_content(source, articles)
 
-        if feed.bozo and feed.bozo_exception:
-            logger.warning(f"Feed parsing warning for {source['name']}: {feed.bozo_exception}")
+    except Exception as e:
+        logger.error(f"Failed to fetch feed {source.name}: {e}")
+        return []
 
-        entries = feed.entries
 
-        # If more entries than our cap, rank by relevance and keep the best
-        if len(entries) > max_articles:
-            logger.info(f"  {source['name']} has {len(entries)} entries, selecting top {max_articles} by relevance")
-            scored = [(e, _score_entry_relevance(e)) for e in entries]
-            scored.sort(key=lambda x: x[1], reverse=True)
-            entries = [e for e, _ in scored[:max_articles]]
+async def _download_feed(
+    client: httpx.AsyncClient,
+    feed_slots: asyncio.Semaphore,
+    host_limits: dict[str, asyncio.Semaphore],
+    source: FeedSource,
+) -> Optional[tuple[bytes, str]]:
+    """
+    Download one feed's XML as (body, content_type), or return None on failure.
 
-        articles = []
-        skipped_empty = 0
-        for entry in entries:
-            article = parse_feed_entry(entry, source, fetch_full=fetch_full)
-            if article and article.content:  # Only include articles with content
-                articles.append(article)
-            else:
-                skipped_empty += 1
+    Sends a conditional GET when an earlier body is cached, and reuses that
+    body if the server reports the feed unchanged.
+    """
+    cache = get_feed_cache()
+    cached = cache.get(source.url) if cache else None
+    headers = {}
+    if cached:
+        etag, last_modified, _, _ = cached
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
 
-        if skipped_empty > 0:
-            logger.warning(f"  ⚠ Skipped {skipped_empty} entries with no content from {source['name']}")
+    try:
+        host = urlparse(source.url).netloc.lower()
+        async with feed_slots, host_limits[host]:
+            response = await client.get(source.url, headers=headers)
+        if response.status_code == 304 and cached:
+            logger.info(f"Feed unchanged: {source.name}")
+            return cached[3], cached[2]
+        response.raise_for_status()
+    except Exception as e:
+        logger.error(f"Failed to fetch feed {source.name}: {e}")
+        return None
+
+    content_type = response.headers.get('content-type', '')
+    if cache:
+        cache.put(
+            source.url,
+            response.headers.get('etag'),
+            response.headers.get('last-modified'),
+            content_type,
+            response.content,
+        )
+    return response.content, content_type
 
-        logger.info(f"Fetched {len(articles)} articles from {source['name']}")
-        return articles
 
+async def _fetch_page(
+    client: httpx.AsyncClient,
+    page_slots: asyncio.Semaphore,
+    host_limits: dict[str, asyncio.Semaphore],
+    parse_pool: ProcessPoolExecutor,
+    url: str,
+) -> Optional[str]:
+    """
+    Download one article page within the global and per-host limits, then
+    extract its text in the parse pool so parsing runs off the event loop
+    and across cores.
+
+    Returns None if fetching or parsing fails, so one bad link never takes
+    down the rest of the batch.
+    """
+    try:
+        host = urlparse(url).netloc.lower()
+        async with page_slots, host_limits[host], client.stream('GET', url) as response:
+            response.raise_for_status()
+            html = bytearray()
+            async for chunk in response.aiter_bytes():
+                html += chunk
+                if len(html) >= MAX_PAGE_BYTES:
+                    break
+            encoding = response.charset_encoding
+
+        return await asyncio.get_running_loop().run_in_executor(
+            parse_pool, extract_article_content, bytes(html[:MAX_PAGE_BYTES]), url, encoding
+        )
     except Exception as e:
-        logger.error(f"Failed to fetch feed {source['name']}: {e}")
-        return []
+        logger.warning(f"Failed to fetch full content from {url}: {e}")
+        return None
+
+
+async def _enrich_all(
+    client: httpx.AsyncClient,
+    page_slots: asyncio.Semaphore,
+    host_limits: dict[str, asyncio.Semaphore],
+    pending: list[tuple[Article, bool]],
+) -> None:
+    """Swap in full page content for every short article."""
+    pages = await _fetch_pages(client, page_slots, host_limits, [article.url for article, _ in pending])
+    for article, summary_from_content in pending:
+        logger.info(f"  Content too short ({len(article.content)} chars), fetched from URL: {article.url[:80]}...")
+        _apply_full_content(article, pages[article.url], summary_from_content)
+
+
+async def _fetch_pages(
+    client: httpx.AsyncClient,
+    page_slots: asyncio.Semaphore,
+    host_limits: dict[str, asyncio.Semaphore],
+    urls: list[str],
+) -> dict[str, Optional[str]]:
+    """
+    Return {url: extracted text or None} for every URL.
+
+    Pages cached by earlier runs are reused; the rest are fetched
+    concurrently, once per distinct URL, and added to the cache.
+    """
+    cache = get_content_cache()
+    urls = list(dict.fromkeys(urls))
+    ids = {url: generate_article_id(url) for url in urls}
+    cached = cache.get_many(list(ids.values())) if cache else {}
+
+    to_fetch = [url for url in urls if ids[url] not in cached]
+    fetched = []
+    if to_fetch:
+        with ProcessPoolExecutor(max_workers=min(PARSE_WORKERS, len(to_fetch))) as parse_pool:
+            fetched = await asyncio.gather(
+                *(_fetch_page(client, page_slots, host_limits, parse_pool, url) for url in to_fetch)
+            )
+    pages = dict(zip(to_fetch, fetched))
+    if cache:
+        cache.put_many([(ids[url], text) for url, text in pages.items() if text])
+
+    if cached:
+        logger.info(f"  Reused {len(cached)} cached pages, fetched {len(to_fetch)}")
+    return {url: cached[ids[url]] if ids[url] in cached else pages[url] for url in urls}
+
+
+def _async_client() -> httpx.AsyncClient:
+    """Pooled async client shared by every request of one concurrent fetch."""
+    return httpx.AsyncClient(
+        headers=HEADERS,
+        timeout=FEED_TIMEOUT,
+        follow_redirects=True,
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=HTTP_RETRIES,
+            limits=httpx.Limits(max_connections=max(FEED_CONCURRENCY, ARTICLE_CONCURRENCY)),
+        ),
+    )
+
+
+def fetch_full_contents(urls: Sequence[str]) -> dict[str, Optional[str]]:
+    """
+    Fetch and extract full article content for many URLs concurrently.
+
+    Same limits and content cache as the feed pipeline's enrichment pass.
+    Returns {url: text}, with None for pages that failed to fetch or parse;
+    one bad URL never fails the others.
+    """
+    async def run() -> dict[str, Optional[str]]:
+        async with _async_client() as client:
+            return await _fetch_pages(
+                client,
+                asyncio.Semaphore(ARTICLE_CONCURRENCY),
+                defaultdict(lambda: asyncio.Semaphore(FEED_CONCURRENCY_PER_HOST)),
+                list(urls),
+            )
+
+    return asyncio.run(run()) if urls else {}
+
+
+async def _fetch_feeds_async(
+    feeds: Sequence[FeedSource],
+    fetch_full: bool,
+    max_articles: int,
+) -> list[Article]:
+    """
+    Download every feed, then fetch all short articles' pages, concurrently.
+
+    One pooled client serves both stages, so connections to publishers that
+    host both a feed and its articles are reused. Articles keep feed order.
+    """
+    feed_slots = asyncio.Semaphore(FEED_CONCURRENCY)
+    page_slots = asyncio.Semaphore(ARTICLE_CONCURRENCY)
+    host_limits = defaultdict(lambda: asyncio.Semaphore(FEED_CONCURRENCY_PER_HOST))
+
+    async with _async_client() as client:
+        downloads = await asyncio.gather(
+            *(_download_feed(client, feed_slots, host_limits, source) for source in feeds)
+        )
+
+        # Metadata pass: parse every feed's entries without touching the network
+        parsed_feeds = []
+        for source, download in zip(feeds, downloads):
+            if download is None:
+                continue
+            feed_body, content_type = download
+            logger.info(f"Fetching feed: {source.name}")
+            try:
+                entries = _load_feed_entries(
+                    source,
+                    max_articles,
+                    feed_body=feed_body,
+                    feed_headers={'content-type': content_type},
+                )
+                parsed_feeds.append((source, [_parse_entry_metadata(e, source) for e in entries]))
+            except Exception as e:
+                logger.error(f"Failed to fetch feed {source.name}: {e}")
+
+        # Enrichment pass: fetch full content for every short article at once
+        if fetch_full:
+            await _enrich_all(client, page_slots, host_limits, [
+                (article, summary_from_content)
+                for _, parsed in parsed_feeds
+                for article, summary_from_content in filter(None, parsed)
+                if _needs_full_content(article)
+            ])
+
+    all_articles = []
+    for source, parsed in parsed_feeds:
+        all_articles.extend(_keep_with_content(source, [p[0] if p else None for p in parsed]))
+    return all_articles
 
 
 def fetch_all_feeds(
-    feeds: list[dict] = None,
+    feeds: Sequence[FeedSource] = None,
     fetch_full: bool = True,
     categories: list[str] = None,
     priorities: list[str] = None,
@@ -425,7 +1163,7 @@ def fetch_all_feeds(
     Fetch articles from all configured RSS feeds.
 
     Args:
-        feeds: List of feed configs (default: RSS_FEEDS from config)
+        feeds: FeedSource configs (default: RSS_FEEDS from config)
         fetch_full: Whether to fetch full content from article URLs (default True)
         categories: Filter to only these categories
         priorities: Filter to only these priorities
@@ -437,15 +1175,14 @@ def fetch_all_feeds(
 
     # Apply filters
     if categories:
-        feeds = [f for f in feeds if f['category'] in categories]
+        feeds = [f for f in feeds if f.category in categories]
     if priorities:
-        feeds = [f for f in feeds if f['priority'] in priorities]
+        feeds = [f for f in feeds if f.priority in priorities]
 
-    all_articles = []
-
-    for source in feeds:
-        articles = fetch_feed(source, fetch_full=fetch_full)
-        all_articles.extend(articles)
+    # Network-bound: feed downloads and full-content fetches run concurrently
+    all_articles = asyncio.run(
+        _fetch_feeds_async(feeds, fetch_full, INGESTION_CONFIG.max_articles_per_feed)
+    )
 
     # Sort by published date (newest first)
     all_articles.sort(
@@ -25,12 +25,12 @@ setup_daily_brief.py, and run `python setup_daily_brief.py` to create the
 import argparse
 import json
 import logging
-import math
 import os
 import sys
 import traceback
 from datetime import datetime, timedelta, timezone
 
+import numpy as np
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
@@ -69,38 +69,20 @@ def parse_embedding(value):
     """pgvector columns may come back as a list or a stringified '[...]'."""
     if value is None:
         return None
-    if isinstance(value, list):
-        return value
     if isinstance(value, str):
         try:
-            return json.loads(value)
+            value = json.loads(value)
         except (json.JSONDecodeError, ValueError):
             return None
+    if isinstance(value, list) and value:
+        return np.asarray(value, dtype=np.float64)
     return None
 
 
-def mean_vector(vectors):
-    """Element-wise mean of a list of equal-length vectors."""
-    if not vectors:
-        return None
-    dims = len(vectors[0])
-    acc = [0.0] * dims
-    for v in vectors:
-        for i in range(dims):
-            acc[i] += v[i]
-    n = len(vectors)
-    return [x / n for x in acc]
-
-
-def cosine_similarity(a, b):
-    if not a or not b:
-        return 0.0
-    dot = sum(x * y for x, y in zip(a, b))
-    mag_a = math.sqrt(sum(x * x for x in a))
-    mag_b = math.sqrt(sum(y * y for y in b))
-    if mag_a == 0 or mag_b == 0:
-        return 0.0
-    return dot / (mag_a * mag_b)
+def unit_vector(v):
+    """v scaled to length 1 (a zero vector stays zero, i.e. similarity 0)."""
+    norm = np.linalg.norm(v)
+    return v / norm if norm else np.zeros_like(v)
 
 
 # =============================================================================
@@ -163,7 +145,7 @@ def fetch_article_embeddings(supabase, article_ids, batch_size=25):
 
         for c in (resp.data or []):
             emb = parse_embedding(c.get("embedding"))
-            if emb and c["article_id"] not in by_article:
+            if emb is not None and c["article_id"] not in by_article:
                 by_article[c["article_id"]] = emb
 
     return by_article
@@ -177,29 +159,39 @@ def cluster_articles(articles, embeddings):
     each form their own singleton cluster.
     """
     clusters = []  # each: {"centroid": vec, "articles": [...]}
+    embedded = []  # clusters with a centroid, row-aligned with unit_centroids
+    sums = []  # running sum of member embeddings per embedded cluster
+    unit_centroids = None  # (rows, dims) matrix of length-1 centroids
     for article in articles:
         emb = embeddings.get(article["id"])
         if emb is None:
             clusters.append({"centroid": None, "articles": [article]})
             continue
 
-        best = None
-        best_sim = SIMILARITY_THRESHOLD
-        for cluster in clusters:
-            if cluster["centroid"] is None:
-                continue
-            sim = cosine_similarity(emb, cluster["centroid"])
-            if sim > best_sim:
-                best_sim = sim
-                best = cluster
-
-        if best is None:
-            clusters.append({"centroid": emb, "articles": [article]})
+        if unit_centroids is None:
+            unit_centroids = np.empty((len(articles), emb.shape[0]))
+
+        # Cosine similarity against every centroid in one matrix-vector product
+        best_row = None
+        if embedded:
+            sims = unit_centroids[:len(embedded)] @ unit_vector(emb)
+            row = int(np.argmax(sims))
+            if sims[row] > SIMILARITY_THRESHOLD:
+                best_row = row
+
+        if best_row is None:
+            cluster = {"centroid": emb, "articles": [article]}
+            clusters.append(cluster)
+            embedded.append(cluster)
+            sums.append(emb.copy())
+            unit_centroids[len(embedded) - 1] = unit_vector(emb)
         else:
-            best["articles"].append(article)
-            # Recompute centroid as mean of member embeddings.
-            member_embs = [embeddings[a["id"]] for a in best["articles"] if embeddings.get(a["id"])]
-            best["centroid"] = mean_vector(member_embs)
+            cluster = embedded[best_row]
+            cluster["articles"].append(article)
+            # Centroid is the mean of member embeddings, kept as a running sum.
+            sums[best_row] += emb
+            cluster["centroid"] = sums[best_row] / len(cluster["articles"])
+            unit_centroids[best_row] = unit_vector(sums[best_row])
 
     return clusters
 
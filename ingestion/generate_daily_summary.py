@@ -9,7 +9,7 @@ in the daily_summaries table for display on the homepage.
 Usage:
     python generate_daily_summary.py [--hours 24] [--dry-run]
 
-Required database table (run in Supabase SQL Editor if not exists):
+Required database objects (run in Supabase SQL Editor if not exists):
 
     CREATE TABLE IF NOT EXISTS daily_summaries (
       id TEXT PRIMARY KEY DEFAULT gen_random_uuid()::text,
@@ -22,22 +22,102 @@ Required database table (run in Supabase SQL Editor if not exists):
     );
     CREATE INDEX IF NOT EXISTS daily_summaries_date_idx
       ON daily_summaries(date DESC);
+
+    -- Most frequent taxonomy keywords among articles in a time window
+    CREATE OR REPLACE FUNCTION trending_keywords(
+      fetched_since TIMESTAMPTZ DEFAULT NULL,
+      published_since TIMESTAMPTZ DEFAULT NULL,
+      published_until TIMESTAMPTZ DEFAULT NULL,
+      max_keywords INT DEFAULT 7
+    )
+    RETURNS TABLE (keyword TEXT, article_count BIGINT)
+    LANGUAGE sql STABLE
+    AS $$
+      SELECT kw, count(*)
+      FROM articles, unnest(keywords) AS kw
+      WHERE (fetched_since IS NULL OR fetched_at >= fetched_since)
+        AND (published_since IS NULL OR published_at >= published_since)
+        AND (published_until IS NULL OR published_at < published_until)
+      GROUP BY kw
+      ORDER BY count(*) DESC, kw
+      LIMIT max_keywords;
+    $$;
+
+    -- Recent chunks spread across sources: every source's newest chunk
+    -- first, then every source's second, and so on
+    CREATE OR REPLACE FUNCTION recent_diverse_chunks(
+      created_since TIMESTAMPTZ,
+      created_until TIMESTAMPTZ DEFAULT NULL,
+      max_chunks INT DEFAULT 30
+    )
+    RETURNS TABLE (text TEXT, article_title TEXT, article_url TEXT, source_name TEXT)
+    LANGUAGE sql STABLE
+    AS $$
+      SELECT c.text, c.article_title, c.article_url, c.source_name
+      FROM (
+        SELECT ch.text, ch.article_title, ch.article_url, ch.source_name, ch.created_at,
+               row_number() OVER (
+                 PARTITION BY ch.source_name
+                 ORDER BY ch.created_at DESC, ch.chunk_index
+               ) AS source_rank
+        FROM chunks ch
+        WHERE ch.created_at >= created_since
+          AND (created_until IS NULL OR ch.created_at < created_until)
+      ) c
+      ORDER BY c.source_rank, c.created_at DESC
+      LIMIT max_chunks;
+    $$;
+
+Without trending_keywords, Claude is asked for the trending keywords instead;
+without recent_diverse_chunks, the latest chunks are used as context.
 """
 
 import argparse
 import logging
 import os
+import re
 import sys
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 from dotenv import load_dotenv
 
-load_dotenv(override=True)
-
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
+# Section labels in Claude's response, each mapped to the label that follows it
+_SECTION_LABELS = re.compile(r"(SUMMARY|TITLE|HEADLINES|TRENDING_KEYWORDS):")
+_NEXT_SECTION = {"SUMMARY": "TITLE", "TITLE": "HEADLINES", "HEADLINES": "TRENDING_KEYWORDS"}
+
+# Article fields the headline list is built from, and how many it lists
+ARTICLE_COLUMNS = "title, url, source_name"
+MAX_HEADLINE_CANDIDATES = 50
+MAX_TRENDING_KEYWORDS = 7
+MAX_CONTEXT_CHUNKS = 30
+CHUNK_COLUMNS = "text, article_title, article_url, source_name"
+
+
+def split_sections(response_text: str) -> dict[str, str]:
+    """
+    Split Claude's response into {label: raw section text} in one regex scan.
+
+    A section starts after the first occurrence of its label and runs until
+    the label repeats or the next section's label appears (or the text ends).
+    """
+    labels = [(m.group(1), m.start(), m.end()) for m in _SECTION_LABELS.finditer(response_text)]
+    sections = {}
+    for i, (label, _, body_start) in enumerate(labels):
+        if label in sections:
+            continue
+        stop_labels = (label, _NEXT_SECTION.get(label))
+        body_end = next(
+            (start for other, start, _ in labels[i + 1:] if other in stop_labels),
+            len(response_text),
+        )
+        sections[label] = response_text[body_start:body_end]
+    return sections
+
 
 def ensure_table_exists(supabase):
     """Check that daily_summaries table exists by doing a lightweight query."""
@@ -58,13 +138,43 @@ def ensure_table_exists(supabase):
         return True  # optimistically continue
 
 
+def fetch_trending_keywords(query):
+    """
+    Run a trending_keywords RPC and return the keyword names, most common first.
+
+    Returns None if the function isn't installed (or the call fails), so the
+    caller can fall back to asking Claude for them.
+    """
+    try:
+        return [row["keyword"] for row in query.execute().data or []]
+    except Exception as e:
+        logger.warning(
+            "trending_keywords RPC unavailable, asking Claude instead "
+            "(see the docstring at the top of this file): %s", e
+        )
+        return None
+
+
+def fetch_context_chunks(diverse_query, latest_query):
+    """
+    Run a recent_diverse_chunks RPC and return its rows.
+
+    Falls back to latest_query (newest chunks regardless of source) if the
+    function isn't installed or the call fails.
+    """
+    try:
+        return diverse_query.execute().data or []
+    except Exception as e:
+        logger.warning(
+            "recent_diverse_chunks RPC unavailable, using the latest chunks instead "
+            "(see the docstring at the top of this file): %s", e
+        )
+        return latest_query.execute().data or []
+
+
 def generate_daily_summary(hours: int = 24, dry_run: bool = False, target_date: str = None):
     """Generate a daily summary from recently ingested articles."""
 
-    # Lazy imports so --help works without credentials
-    from supabase import create_client
-    from anthropic import Anthropic
-
     supabase_url = os.environ.get("SUPABASE_URL")
     supabase_key = os.environ.get("SUPABASE_KEY")
     anthropic_key = os.environ.get("ANTHROPIC_API_KEY")
@@ -81,13 +191,13 @@ def generate_daily_summary(hours: int = 24, dry_run: bool = False, target_date:
         logger.error("Missing required env vars: %s", ", ".join(missing))
         sys.exit(1)
 
+    # Lazy imports so --help (and a misconfigured run) don't load the SDKs
+    from supabase import create_client
+    from anthropic import Anthropic
+
     supabase = create_client(supabase_url, supabase_key)
     anthropic = Anthropic(api_key=anthropic_key)
 
-    # Verify table exists
-    if not ensure_table_exists(supabase):
-        sys.exit(1)
-
     if target_date:
         from datetime import date as date_type
         today = datetime.strptime(target_date, "%Y-%m-%d").date()
@@ -95,57 +205,112 @@ def generate_daily_summary(hours: int = 24, dry_run: bool = False, target_date:
         day_end = (datetime(today.year, today.month, today.day, tzinfo=timezone.utc) + timedelta(days=1)).isoformat()
         logger.info("Backfill mode: generating summary for %s", today)
 
-        # ── Fetch articles published on the target date ──────────────
-        articles_resp = (
-            supabase.table("articles")
-            .select("id, title, url, source_name, keywords, summary, published_at")
-            .gte("published_at", day_start)
-            .lt("published_at", day_end)
-            .execute()
-        )
-        articles = articles_resp.data or []
-        article_count = len(articles)
-        recent_articles = articles
-
-        chunks_resp = (
+        # ── Articles published on the target date ────────────────────
+        queries = {
+            "articles": (
+                supabase.table("articles")
+                .select(ARTICLE_COLUMNS)
+                .gte("published_at", day_start)
+                .lt("published_at", day_end)
+                .order("published_at", desc=True)
+                .limit(MAX_HEADLINE_CANDIDATES)
+            ),
+            "count": (
+                supabase.table("articles")
+                .select("id", count="exact", head=True)
+                .gte("published_at", day_start)
+                .lt("published_at", day_end)
+            ),
+        }
+        # The articles query already spans every counted article
+        fallback_articles_query = None
+        diverse_chunks_query = supabase.rpc("recent_diverse_chunks", {
+            "created_since": day_start,
+            "created_until": day_end,
+            "max_chunks": MAX_CONTEXT_CHUNKS,
+        })
+        latest_chunks_query = (
             supabase.table("chunks")
-            .select("text, article_title, article_url, source_name")
+            .select(CHUNK_COLUMNS)
             .gte("created_at", day_start)
             .lt("created_at", day_end)
-            .limit(50)
-            .execute()
+            .order("created_at", desc=True)
+            .limit(MAX_CONTEXT_CHUNKS)
         )
+        trending_query = supabase.rpc("trending_keywords", {
+            "published_since": day_start,
+            "published_until": day_end,
+            "max_keywords": MAX_TRENDING_KEYWORDS,
+        })
     else:
-        today = datetime.now(timezone.utc).date()
-        cutoff = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
-
-        # ── Fetch recent articles ────────────────────────────────────────
+        now = datetime.now(timezone.utc)
+        today = now.date()
+        cutoff = (now - timedelta(hours=hours)).isoformat()
+        # fetched_at tracks ingestion time, but published_at may be older —
+        # only articles actually published within the last 24 hours are
+        # downloaded; the rest of the window is just counted
+        recent_cutoff = (now - timedelta(hours=24)).isoformat()
+
+        # ── Recent articles ──────────────────────────────────────────────
         logger.info("Fetching articles from the last %d hours...", hours)
-        articles_resp = (
+        queries = {
+            "articles": (
+                supabase.table("articles")
+                .select(ARTICLE_COLUMNS)
+                .gte("fetched_at", cutoff)
+                .gte("published_at", recent_cutoff)
+                .order("published_at", desc=True)
+                .limit(MAX_HEADLINE_CANDIDATES)
+            ),
+            "count": (
+                supabase.table("articles")
+                .select("id", count="exact", head=True)
+                .gte("fetched_at", cutoff)
+            ),
+        }
+        # Headline candidates if nothing fetched was published recently
+        fallback_articles_query = (
             supabase.table("articles")
-            .select("id, title, url, source_name, keywords, summary, published_at")
+            .select(ARTICLE_COLUMNS)
             .gte("fetched_at", cutoff)
-            .execute()
+            .order("fetched_at", desc=True)
+            .limit(MAX_HEADLINE_CANDIDATES)
         )
-        articles = articles_resp.data or []
-        article_count = len(articles)
-
-        # Filter to articles actually published within the last 24 hours
-        # (fetched_at tracks ingestion time, but published_at may be older)
-        recent_cutoff = (datetime.now(timezone.utc) - timedelta(hours=24)).isoformat()
-        recent_articles = [
-            a for a in articles
-            if a.get("published_at") and a["published_at"] >= recent_cutoff
-        ]
-        logger.info("Of %d fetched articles, %d were published in the last 24h", article_count, len(recent_articles))
-
-        chunks_resp = (
+        diverse_chunks_query = supabase.rpc("recent_diverse_chunks", {
+            "created_since": cutoff,
+            "max_chunks": MAX_CONTEXT_CHUNKS,
+        })
+        latest_chunks_query = (
             supabase.table("chunks")
-            .select("text, article_title, article_url, source_name")
+            .select(CHUNK_COLUMNS)
             .gte("created_at", cutoff)
-            .limit(50)
-            .execute()
+            .order("created_at", desc=True)
+            .limit(MAX_CONTEXT_CHUNKS)
         )
+        trending_query = supabase.rpc("trending_keywords", {
+            "fetched_since": cutoff,
+            "max_keywords": MAX_TRENDING_KEYWORDS,
+        })
+
+    # The queries are independent — run them side by side so their
+    # round-trips overlap instead of adding up. The daily_summaries check
+    # rides along too, and still stops the run before Claude is called.
+    with ThreadPoolExecutor(max_workers=len(queries) + 3) as pool:
+        table_check = pool.submit(ensure_table_exists, supabase)
+        trending_future = pool.submit(fetch_trending_keywords, trending_query)
+        chunks_future = pool.submit(fetch_context_chunks, diverse_chunks_query, latest_chunks_query)
+        futures = {name: pool.submit(query.execute) for name, query in queries.items()}
+        if not table_check.result():
+            sys.exit(1)
+        responses = {name: future.result() for name, future in futures.items()}
+        trending_keywords = trending_future.result()
+        chunks = chunks_future.result()
+
+    recent_articles = responses["articles"].data or []
+    article_count = responses["count"].count or 0
+    if not target_date:
+        logger.info("Of %d fetched articles, %d recently published ones are headline candidates",
+                    article_count, len(recent_articles))
 
     if article_count == 0:
         logger.info("No articles found for %s — skipping summary.", today)
@@ -153,24 +318,40 @@ def generate_daily_summary(hours: int = 24, dry_run: bool = False, target_date:
 
     logger.info("Found %d articles for %s", article_count, today)
 
-    # ── Fetch chunks for detailed context ────────────────────────────
-    logger.info("Fetching chunks for context...")
-    chunks = chunks_resp.data or []
+    # ── Chunks for detailed context ──────────────────────────────────
     logger.info("Got %d chunks for context", len(chunks))
 
     # Build context from up to 30 diverse chunks
     context = "\n\n".join(
         f"Source: {c['source_name']}\nTitle: {c['article_title']}\nURL: {c['article_url']}\nContent: {c['text']}"
-        for c in chunks[:30]
+        for c in chunks
     )
 
-    # Build article list for headline selection — prefer recently published articles
-    headline_candidates = recent_articles if recent_articles else articles
+    # Build article list for headline selection — prefer recently published
+    # articles, falling back to anything fetched in the window
+    headline_candidates = recent_articles
+    if not headline_candidates and fallback_articles_query is not None:
+        headline_candidates = fallback_articles_query.execute().data or []
     article_list = "\n".join(
         f"- {a['title']} | {a['source_name']} | {a['url']}"
-        for a in headline_candidates[:50]
+        for a in headline_candidates
     )
 
+    # Trending keywords are counted from the articles' taxonomy keywords
+    # when the RPC is available; otherwise Claude picks them as a 4th section
+    if trending_keywords is None:
+        keywords_task = """
+4. TRENDING_KEYWORDS
+List 3-7 keywords/topics that appear frequently in today's news.
+Use short terms like: "AI Agents", "OpenAI", "Regulation", "Healthcare AI", etc.
+"""
+        keywords_format = """
+TRENDING_KEYWORDS:
+[keyword1], [keyword2], [keyword3], ...
+"""
+    else:
+        keywords_task = keywords_format = ""
+
     # ── Generate summary with Claude ─────────────────────────────────
     prompt = f"""Analyze today's AI news articles and create a daily summary.
 
@@ -205,11 +386,7 @@ IMPORTANT RULES:
 - If there are fewer than 3 standout stories, include fewer or none
 - Do NOT include older articles that were merely re-ingested today
 - Each headline needs the exact URL from the article list above
-
-4. TRENDING_KEYWORDS
-List 3-7 keywords/topics that appear frequently in today's news.
-Use short terms like: "AI Agents", "OpenAI", "Regulation", "Healthcare AI", etc.
-
+{keywords_task}
 FORMAT YOUR RESPONSE EXACTLY LIKE THIS:
 
 SUMMARY:
@@ -225,10 +402,7 @@ TITLE:
 HEADLINES:
 - [Headline title 1] | [exact URL]
 - [Headline title 2] | [exact URL]
-
-TRENDING_KEYWORDS:
-[keyword1], [keyword2], [keyword3], ...
-"""
+{keywords_format}"""
 
     logger.info("Calling Claude to generate summary...")
     response = anthropic.messages.create(
@@ -244,18 +418,19 @@ TRENDING_KEYWORDS:
     title = ""
     summary = ""
     headlines = []
-    trending_keywords = []
 
-    if "SUMMARY:" in response_text:
+    sections = split_sections(response_text)
+
+    if "SUMMARY" in sections:
         # SUMMARY comes before TITLE in the response
-        summary = response_text.split("SUMMARY:")[1].split("TITLE:")[0].strip()
+        summary = sections["SUMMARY"].strip()
 
-    if "TITLE:" in response_text:
+    if "TITLE" in sections:
         # TITLE comes between SUMMARY and HEADLINES
-        title = response_text.split("TITLE:")[1].split("HEADLINES:")[0].strip()
+        title = sections["TITLE"].strip()
 
-    if "HEADLINES:" in response_text:
-        headlines_section = response_text.split("HEADLINES:")[1].split("TRENDING_KEYWORDS:")[0].strip()
+    if "HEADLINES" in sections:
+        headlines_section = sections["HEADLINES"].strip()
         for line in headlines_section.split("\n"):
             line = line.strip()
             if line.startswith("-") and "|" in line:
@@ -266,15 +441,17 @@ TRENDING_KEYWORDS:
                     if h_title and url.startswith("http"):
                         headlines.append({"title": h_title, "url": url})
 
-    if "TRENDING_KEYWORDS:" in response_text:
-        keywords_line = response_text.split("TRENDING_KEYWORDS:")[1].strip().split("\n")[0]
-        trending_keywords = [k.strip() for k in keywords_line.split(",") if k.strip()]
+    if trending_keywords is None:
+        trending_keywords = []
+        if "TRENDING_KEYWORDS" in sections:
+            keywords_line = sections["TRENDING_KEYWORDS"].strip().partition("\n")[0]
+            trending_keywords = [k.strip() for k in keywords_line.split(",") if k.strip()]
 
     # ── Log results ──────────────────────────────────────────────────
-    logger.info("Parsed title: %s", title[:80] if title else "(none)")
-    logger.info("Parsed summary: %d chars", len(summary))
-    logger.info("Parsed headlines: %d", len(headlines))
-    logger.info("Parsed trending keywords: %s", trending_keywords)
+    logger.info(
+        "Parsed title: %s\n  summary: %d chars\n  headlines: %d\n  trending keywords: %s",
+        title[:80] if title else "(none)", len(summary), len(headlines), trending_keywords,
+    )
 
     if not summary:
         logger.error("Failed to parse summary from Claude response. Raw response:\n%s", response_text[:500])
@@ -310,10 +487,10 @@ TRENDING_KEYWORDS:
     ).execute()
     logger.info("Database upsert result: %d rows", len(result.data) if result.data else 0)
 
-    logger.info("Daily summary saved for %s", today)
-    logger.info("  Articles analyzed: %d", article_count)
-    logger.info("  Headlines: %d", len(headlines))
-    logger.info("  Trending keywords: %d", len(trending_keywords))
+    logger.info(
+        "Daily summary saved for %s\n  Articles analyzed: %d\n  Headlines: %d\n  Trending keywords: %d",
+        today, article_count, len(headlines), len(trending_keywords),
+    )
 
 
 if __name__ == "__main__":
@@ -323,6 +500,9 @@ if __name__ == "__main__":
     parser.add_argument("--date", help="Backfill: generate summary for a specific date (YYYY-MM-DD)")
     args = parser.parse_args()
 
+    # Only the CLI reads .env; importers bring their own environment
+    load_dotenv(override=True)
+
     try:
         generate_daily_summary(hours=args.hours, dry_run=args.dry_run, target_date=args.date)
     except Exception as e:
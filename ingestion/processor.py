@@ -9,6 +9,7 @@ This module handles:
 
 import re
 import logging
+import unicodedata
 from dataclasses import dataclass
 from typing import Optional
 
@@ -60,6 +61,15 @@ class Chunk:
 # TEXT CLEANING
 # =============================================================================
 
+# Control characters (except newlines and tabs), as a regex and as a
+# str.translate deletion table. translate is several times faster on ASCII
+# text but much slower than the regex on anything else.
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]')
+_ASCII_CONTROL_CHARS = dict.fromkeys([*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), 0x7f])
+_INLINE_WHITESPACE_RE = re.compile(r'[^\S\n]+')
+_EXCESS_NEWLINES_RE = re.compile(r'\n{3,}')
+
+
 def clean_text(text: str) -> str:
     """
     Clean and normalize text for processing.
@@ -73,17 +83,19 @@ def clean_text(text: str) -> str:
         return ""
     
     # Normalize unicode
-    import unicodedata
     text = unicodedata.normalize('NFKC', text)
     
     # Remove control characters (except newlines and tabs)
-    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', text)
+    if text.isascii():
+        text = text.translate(_ASCII_CONTROL_CHARS)
+    else:
+        text = _CONTROL_CHARS_RE.sub('', text)
     
     # Normalize whitespace within lines
-    text = re.sub(r'[^\S\n]+', ' ', text)
+    text = _INLINE_WHITESPACE_RE.sub(' ', text)
     
     # Normalize line breaks (max 2 consecutive)
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = _EXCESS_NEWLINES_RE.sub('\n\n', text)
     
     # Strip leading/trailing whitespace from lines
     lines = [line.strip() for line in text.splitlines()]
@@ -99,6 +111,16 @@ def clean_text(text: str) -> str:
 # TEXT CHUNKING
 # =============================================================================
 
+# Marks that end a sentence / clause when followed by whitespace
+_SENTENCE_ENDS = ('. ', '.\n', '! ', '!\n', '? ', '?\n')
+_CLAUSE_ENDS = (', ', '; ', ': ')
+
+
+def _rfind_any(text: str, patterns: tuple[str, ...], lo: int, hi: int) -> int:
+    """Start of the last occurrence of any pattern within text[lo:hi], or -1."""
+    return max(text.rfind(pattern, lo, hi) for pattern in patterns)
+
+
 def find_split_point(text: str, target_pos: int, search_range: int = 100) -> int:
     """
     Find the best position to split text near target_pos.
@@ -108,33 +130,44 @@ def find_split_point(text: str, target_pos: int, search_range: int = 100) -> int
     2. Sentence endings
     3. Clause boundaries (commas, semicolons)
     4. Word boundaries
+    
+    Each tier is the closest boundary at or before target_pos (but after
+    target_pos - search_range), found with C-level str.rfind searches.
     """
     # Clamp target to valid range
     target_pos = min(target_pos, len(text))
     
-    # Define search window
+    # Define search window: boundaries may start in (start, target_pos]
     start = max(0, target_pos - search_range)
-    end = min(len(text), target_pos + search_range)
+    lo, hi = start + 1, target_pos + 2
     
     # Search for paragraph break (double newline)
-    for i in range(target_pos, start, -1):
-        if i < len(text) - 1 and text[i:i+2] == '\n\n':
-            return i + 2
+    i = text.rfind('\n\n', lo, hi)
+    if i != -1:
+        return i + 2
+    
+    # A sentence or clause mark that ends the text needs no trailing space
+    last = len(text) - 1
+    last_in_window = lo <= last <= target_pos
     
     # Search for sentence ending
-    for i in range(target_pos, start, -1):
-        if i < len(text) and text[i] in '.!?' and (i + 1 >= len(text) or text[i+1] in ' \n'):
-            return i + 1
+    if last_in_window and text[last] in '.!?':
+        return last + 1
+    i = _rfind_any(text, _SENTENCE_ENDS, lo, hi)
+    if i != -1:
+        return i + 1
     
     # Search for clause boundary
-    for i in range(target_pos, start, -1):
-        if i < len(text) and text[i] in ',;:' and (i + 1 >= len(text) or text[i+1] == ' '):
-            return i + 1
+    if last_in_window and text[last] in ',;:':
+        return last + 1
+    i = _rfind_any(text, _CLAUSE_ENDS, lo, hi)
+    if i != -1:
+        return i + 1
     
     # Fall back to word boundary
-    for i in range(target_pos, start, -1):
-        if i < len(text) and text[i] == ' ':
-            return i + 1
+    i = text.rfind(' ', lo, target_pos + 1)
+    if i != -1:
+        return i + 1
     
     # Last resort: just split at target
     return target_pos
@@ -174,16 +207,17 @@ def chunk_text(
     
     chunks = []
     start = 0
+    text_len = len(text)
     
-    while start < len(text):
+    while True:
         # Calculate end position
         end = start + chunk_size
         
         # If we're not at the end, find a good split point
-        if end < len(text):
+        if end < text_len:
             end = find_split_point(text, end)
         else:
-            end = len(text)
+            end = text_len
         
         # Extract chunk
         chunk_text = text[start:end].strip()
@@ -192,13 +226,16 @@ def chunk_text(
         if len(chunk_text) >= min_chunk_size:
             chunks.append((chunk_text, start, end))
         
-        # Move start position, accounting for overlap
-        # The overlap means we back up a bit from the end
-        start = end - chunk_overlap
+        # A chunk reaching the end of the text is the last one; backing up
+        # from it would only repeat its own tail as an extra chunk
+        if end >= text_len:
+            break
         
-        # Make sure we're making progress
-        if start <= chunks[-1][1] if chunks else 0:
-            start = end
+        # Move start position, accounting for overlap
+        # The overlap means we back up a bit from the end, but the next
+        # chunk must still start after this one
+        next_start = end - chunk_overlap
+        start = next_start if next_start > start else end
     
     return chunks
 
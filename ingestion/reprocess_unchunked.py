@@ -13,15 +13,33 @@ Usage:
     python reprocess_unchunked.py --dry-run    # Show what would be processed
     python reprocess_unchunked.py --mock       # Use mock embeddings (no API cost)
     python reprocess_unchunked.py --source "TechCrunch AI"  # Only this source
+
+Optional database objects (run in Supabase SQL Editor) - without them the
+script falls back to downloading every article and every chunk's article_id
+and diffing them client-side:
+
+    CREATE INDEX IF NOT EXISTS chunks_article_id_idx ON chunks(article_id);
+
+    -- Articles with no chunks, optionally limited to one source
+    CREATE OR REPLACE FUNCTION unchunked_articles(src TEXT DEFAULT NULL)
+    RETURNS SETOF articles
+    LANGUAGE sql STABLE
+    AS $$
+      SELECT a.*
+      FROM articles a
+      WHERE (src IS NULL OR a.source_name = src)
+        AND NOT EXISTS (SELECT 1 FROM chunks c WHERE c.article_id = a.id);
+    $$;
 """
 
 import argparse
 import logging
 import sys
+import time
 from datetime import datetime
 
 from config import DATABASE_CONFIG
-from fetcher import Article, fetch_full_content
+from fetcher import Article, fetch_full_contents
 from processor import chunk_article
 from embedder import get_embedder
 from storage import get_storage
@@ -36,41 +54,171 @@ logger = logging.getLogger(__name__)
 # Minimum content length — if below this, try to fetch from URL
 MIN_CONTENT_LENGTH = 500
 
+ARTICLE_COLUMNS = "id, title, url, content, summary, published_at, source_name, source_category, source_priority, keywords"
 
-def get_unchunked_articles(client, source_name: str = None) -> list[dict]:
-    """Find articles that have no chunks in the database."""
-    # Get all article IDs
-    query = client.table("articles").select("id, title, url, content, summary, published_at, source_name, source_category, source_priority, keywords")
-
-    if source_name:
-        query = query.eq("source_name", source_name)
+# Rows per request when paging through the unchunked_articles RPC or a
+# table scan (PostgREST caps a single response at 1000 rows by default)
+PAGE_SIZE = 1000
 
-    result = query.execute()
-    all_articles = result.data or []
+# Article IDs per id=in.(...) lookup, keeping request URLs short
+ID_BATCH_SIZE = 100
 
-    # Get all article IDs that DO have chunks
-    chunks_result = client.table("chunks").select("article_id")
-    if source_name:
-        chunks_result = chunks_result.eq("source_name", source_name)
-    chunks_result = chunks_result.execute()
+# Processed articles to buffer before writing back their updated rows in
+# one upsert, followed by their chunks
+UPDATE_BATCH_SIZE = 100
 
-    article_ids_with_chunks = set()
-    for row in (chunks_result.data or []):
-        article_ids_with_chunks.add(row["article_id"])
 
-    # Filter to articles without chunks
-    unchunked = [a for a in all_articles if a["id"] not in article_ids_with_chunks]
+def get_unchunked_articles(client, source_name: str = None) -> list[dict]:
+    """
+    Find articles that have no chunks in the database.
+
+    Uses the unchunked_articles RPC (see the docstring at the top of this
+    file) so only the unchunked rows cross the network, and falls back to
+    diffing the two tables client-side if it isn't installed.
+    """
+    try:
+        return _fetch_unchunked_articles(client, source_name)
+    except Exception as e:
+        logger.warning(
+            "unchunked_articles RPC unavailable, scanning articles and chunks instead: %s", e
+        )
+        return _scan_unchunked_articles(client, source_name)
+
+
+def _fetch_unchunked_articles(client, source_name: str = None) -> list[dict]:
+    """Page through the unchunked_articles RPC."""
+    unchunked = []
+    offset = 0
+    while True:
+        page = (
+            client.rpc("unchunked_articles", {"src": source_name})
+            .select(ARTICLE_COLUMNS)
+            .order("id")
+            .range(offset, offset + PAGE_SIZE - 1)
+            .execute()
+            .data
+            or []
+        )
+        unchunked.extend(page)
+        if len(page) < PAGE_SIZE:
+            return unchunked
+        offset += PAGE_SIZE
+
+
+def _scan_unchunked_articles(client, source_name: str = None) -> list[dict]:
+    """
+    Diff article IDs against chunk article_ids locally, then download full
+    rows only for the articles that have no chunks.
+    """
+    article_ids = [row["id"] for row in _scan_table(client, "articles", "id", source_name)]
+    chunked_ids = {row["article_id"] for row in _scan_table(client, "chunks", "id, article_id", source_name)}
+    missing = [article_id for article_id in article_ids if article_id not in chunked_ids]
+
+    unchunked = []
+    for i in range(0, len(missing), ID_BATCH_SIZE):
+        batch = missing[i:i + ID_BATCH_SIZE]
+        result = client.table("articles").select(ARTICLE_COLUMNS).in_("id", batch).order("id").execute()
+        unchunked.extend(result.data or [])
 
     return unchunked
 
 
+def _scan_table(client, table: str, columns: str, source_name: str = None) -> list[dict]:
+    """Read columns (which must include id) from every row, keyset-paginated on id."""
+    rows = []
+    last_id = None
+    while True:
+        query = client.table(table).select(columns).order("id").limit(PAGE_SIZE)
+        if source_name:
+            query = query.eq("source_name", source_name)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        page = query.execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        last_id = page[-1]["id"]
+
+
+def flush_article_updates(client, rows: list[dict]) -> set[str]:
+    """
+    Write back articles whose content or keywords changed, in one request,
+    and return the IDs that were written.
+
+    The rows are complete articles rows (ARTICLE_COLUMNS), so the upsert
+    always resolves to an UPDATE on the existing id. A batch that fails is
+    retried row by row, so a bad row only loses itself.
+    """
+    if not rows:
+        return set()
+    try:
+        client.table("articles").upsert(rows, on_conflict="id").execute()
+        logger.info(f"Updated {len(rows)} articles")
+        return {row["id"] for row in rows}
+    except Exception as e:
+        if len(rows) == 1:
+            logger.error(f"Failed to update article {rows[0]['id']}: {e}")
+            return set()
+        logger.warning(f"Batch update of {len(rows)} articles failed, retrying one by one: {e}")
+
+    updated = set()
+    for row in rows:
+        try:
+            client.table("articles").upsert(row, on_conflict="id").execute()
+            updated.add(row["id"])
+        except Exception as e:
+            logger.error(f"Failed to update article {row['id']}: {e}")
+    return updated
+
+
+def flush_processed(client, storage, pending: list[tuple[dict, bool, list]]) -> tuple[int, int]:
+    """
+    Write back a batch of processed articles, given as
+    (row, changed, embedded chunks), and return (chunks stored, articles failed).
+
+    Changed rows go first, and only articles whose row was written (or
+    didn't need to be) get their chunks stored. Once an article has chunks
+    it is no longer unchunked, so storing them first would lose its new
+    content and keywords for good if the update then failed or the run
+    died in between; this way such an article is simply picked up again
+    next run.
+
+    Articles queued without chunks already failed to chunk or embed and
+    were counted then; only their updated row is written here, and they
+    are not counted again.
+    """
+    updated = flush_article_updates(client, [row for row, changed, _ in pending if changed])
+
+    failed = 0
+    chunks = []
+    chunked_articles = 0
+    for row, changed, embedded_chunks in pending:
+        if not embedded_chunks:
+            continue
+        if changed and row["id"] not in updated:
+            failed += 1
+        else:
+            chunks.extend(embedded_chunks)
+            chunked_articles += 1
+
+    if not chunks:
+        return 0, failed
+    try:
+        stored = storage.store_embedded_chunks(chunks)
+        print(f"    → Stored {stored} embedded chunks")
+        return stored, failed
+    except Exception as e:
+        logger.error(f"    → Storage failed: {e}")
+        return 0, failed + chunked_articles
+
+
 def reprocess_articles(
     use_mock: bool = False,
     dry_run: bool = False,
     source_name: str = None,
 ):
     """Re-process unchunked articles."""
-    start_time = datetime.now()
+    start_time = time.perf_counter()
 
     print("\n" + "=" * 60)
     print("Re-processing Unchunked Articles")
@@ -109,6 +257,19 @@ def reprocess_articles(
     total_chunks_created = 0
     total_content_updated = 0
     total_failed = 0
+    pending = []
+
+    # Network-bound: fetch every short article's page concurrently up front.
+    # Pages that fail come back as None and those articles keep their stored
+    # content; if the whole batch fails, every article does.
+    try:
+        full_contents = fetch_full_contents([
+            row["url"] for row in unchunked
+            if row.get("url") and len(row.get("content") or "") < MIN_CONTENT_LENGTH
+        ])
+    except Exception as e:
+        logger.error(f"Failed to fetch full content: {e}")
+        full_contents = {}
 
     for i, row in enumerate(unchunked):
         content = row.get("content") or ""
@@ -118,21 +279,17 @@ def reprocess_articles(
 
         print(f"\n  [{i+1}/{len(unchunked)}] [{source}] {title[:60]}")
         print(f"    Current content: {len(content)} chars")
+        changed = False
 
         # Fetch full content if too short
         if len(content) < MIN_CONTENT_LENGTH and url:
-            print(f"    → Fetching full content from URL...")
-            full_content = fetch_full_content(url)
+            full_content = full_contents.get(url)
             if full_content and len(full_content) > len(content):
                 print(f"    → Got {len(full_content)} chars (was {len(content)})")
                 content = full_content
                 total_content_updated += 1
-
-                # Update article content in database
-                try:
-                    client.table("articles").update({"content": content}).eq("id", row["id"]).execute()
-                except Exception as e:
-                    logger.error(f"    → Failed to update article content: {e}")
+                row["content"] = content
+                changed = True
             else:
                 print(f"    → URL fetch didn't improve content")
 
@@ -142,11 +299,9 @@ def reprocess_articles(
             text = f"{title} {content}"
             keywords = classify_text(text)
             if keywords:
-                try:
-                    client.table("articles").update({"keywords": keywords}).eq("id", row["id"]).execute()
-                    print(f"    → Classified with keywords: {', '.join(keywords[:5])}")
-                except Exception as e:
-                    logger.error(f"    → Failed to update keywords: {e}")
+                print(f"    → Classified with keywords: {', '.join(keywords[:5])}")
+                row["keywords"] = keywords
+                changed = True
 
         # Create a mock Article object for the chunker
         article = Article(
@@ -162,34 +317,36 @@ def reprocess_articles(
             keywords=keywords,
         )
 
-        # Chunk
+        # Chunk and embed
+        embedded_chunks = []
         chunks = chunk_article(article)
         if not chunks:
             print(f"    ⚠ Still no chunks after processing")
             total_failed += 1
-            continue
-
-        print(f"    → Created {len(chunks)} chunks")
-
-        # Embed
-        try:
-            embedded_chunks = embedder.embed_chunks(chunks)
-        except Exception as e:
-            logger.error(f"    → Embedding failed: {e}")
-            total_failed += 1
-            continue
-
-        # Store
-        try:
-            stored = storage.store_embedded_chunks(embedded_chunks)
+        else:
+            print(f"    → Created {len(chunks)} chunks")
+            try:
+                embedded_chunks = embedder.embed_chunks(chunks)
+            except Exception as e:
+                logger.error(f"    → Embedding failed: {e}")
+                total_failed += 1
+
+        # Queue the article; updated rows and then chunks are written in bulk
+        if changed or embedded_chunks:
+            pending.append((row, changed, embedded_chunks))
+        if len(pending) >= UPDATE_BATCH_SIZE:
+            stored, failed = flush_processed(client, storage, pending)
             total_chunks_created += stored
-            print(f"    → Stored {stored} embedded chunks")
-        except Exception as e:
-            logger.error(f"    → Storage failed: {e}")
-            total_failed += 1
+            total_failed += failed
+            pending = []
+
+    if pending:
+        stored, failed = flush_processed(client, storage, pending)
+        total_chunks_created += stored
+        total_failed += failed
 
     # Summary
-    duration = (datetime.now() - start_time).total_seconds()
+    duration = time.perf_counter() - start_time
     print("\n" + "=" * 60)
     print("✅ Re-processing Complete!")
     print("=" * 60)
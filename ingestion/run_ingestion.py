@@ -89,7 +89,7 @@ def run_ingestion(
     # Filter feeds if specific sources requested
     feeds = RSS_FEEDS
     if source_names:
-        feeds = [f for f in feeds if f['name'] in source_names]
+        feeds = [f for f in feeds if f.name in source_names]
         print(f"   Filtered to {len(feeds)} sources: {source_names}")
     
     # -------------------------------------------------------------------------
@@ -121,7 +121,7 @@ def run_ingestion(
     if hasattr(storage, 'get_existing_article_ids'):
         print("\n🔍 Checking for new articles...")
         try:
-            existing_ids = storage.get_existing_article_ids()
+            existing_ids = storage.get_existing_article_ids([a.id for a in articles])
             new_articles = [a for a in articles if a.id not in existing_ids]
             stats["articles_new"] = len(new_articles)
             print(f"   ✓ {len(new_articles)} new articles (skipping {len(articles) - len(new_articles)} existing)")
@@ -8,10 +8,15 @@ This module handles:
 """
 
 import logging
-import json
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from datetime import datetime
 
+import numpy as np
+import orjson
+
 from config import DATABASE_CONFIG, EMBEDDING_CONFIG
 
 # Set up logging
@@ -23,9 +28,24 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 
 SCHEMA_SQL = """
--- Enable pgvector extension (run this first in Supabase SQL editor)
+-- Enable pgvector extension (run this first in Supabase SQL editor).
+-- halfvec embeddings need pgvector >= 0.7, match_chunks' iterative index
+-- scans need >= 0.8.
 CREATE EXTENSION IF NOT EXISTS vector;
 
+-- Databases created with vector(1536) embeddings: convert them in place and
+-- drop the old index and search function (the function's argument type
+-- changes, and an overload left behind would make the RPC ambiguous) before
+-- running the rest of this script:
+--   DROP INDEX IF EXISTS chunks_embedding_idx;
+--   DROP FUNCTION IF EXISTS match_chunks(vector, float, int, text, text);
+--   ALTER TABLE chunks ALTER COLUMN embedding TYPE halfvec(1536)
+--     USING embedding::halfvec(1536);
+-- Articles stored by older versions hold authors/tags as JSON strings
+-- ('"[\\"a\\"]"') rather than arrays; unwrap them with:
+--   UPDATE articles SET authors = (authors #>> '{}')::jsonb WHERE jsonb_typeof(authors) = 'string';
+--   UPDATE articles SET tags = (tags #>> '{}')::jsonb WHERE jsonb_typeof(tags) = 'string';
+
 -- Articles table (stores original article metadata)
 CREATE TABLE IF NOT EXISTS articles (
     id TEXT PRIMARY KEY,
@@ -50,7 +70,7 @@ CREATE TABLE IF NOT EXISTS chunks (
     article_id TEXT REFERENCES articles(id) ON DELETE CASCADE,
     chunk_index INTEGER NOT NULL,
     text TEXT NOT NULL,
-    embedding vector(1536),  -- OpenAI text-embedding-3-small dimensions
+    embedding halfvec(1536),  -- OpenAI text-embedding-3-small dimensions, stored as float16
     article_title TEXT,
     article_url TEXT,
     source_name TEXT,
@@ -59,10 +79,14 @@ CREATE TABLE IF NOT EXISTS chunks (
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
--- Index for vector similarity search
+-- Index for vector similarity search. HNSW (pgvector >= 0.5) needs no
+-- training data, so it can be created on the empty table and stays accurate
+-- as chunks are added; an IVFFlat index built here would cluster nothing.
+-- Databases created with the old IVFFlat index: DROP INDEX chunks_embedding_idx
+-- first, then run this.
 CREATE INDEX IF NOT EXISTS chunks_embedding_idx 
-ON chunks USING ivfflat (embedding vector_cosine_ops)
-WITH (lists = 100);
+ON chunks USING hnsw (embedding halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 64);
 
 -- Index for filtering by source
 CREATE INDEX IF NOT EXISTS chunks_source_idx ON chunks(source_name);
@@ -76,7 +100,7 @@ CREATE INDEX IF NOT EXISTS articles_keywords_idx ON articles USING GIN (keywords
 
 -- Function for similarity search
 CREATE OR REPLACE FUNCTION match_chunks(
-    query_embedding vector(1536),
+    query_embedding halfvec(1536),
     match_threshold float DEFAULT 0.7,
     match_count int DEFAULT 10,
     filter_source text DEFAULT NULL,
@@ -94,10 +118,16 @@ RETURNS TABLE (
     published_at timestamptz,
     similarity float
 )
-LANGUAGE plpgsql
+LANGUAGE sql STABLE
+-- With a source/category filter most rows the HNSW scan returns are
+-- discarded; iterative scans (pgvector >= 0.8) keep walking the index until
+-- match_count rows pass instead of stopping after ef_search candidates and
+-- returning too few
+SET hnsw.iterative_scan = strict_order
 AS $$
-BEGIN
-    RETURN QUERY
+    -- Rows above the threshold are always a prefix of the nearest-first
+    -- order, so it is applied to the match_count nearest rows, with each
+    -- distance computed once
     SELECT
         c.id,
         c.article_id,
@@ -108,19 +138,53 @@ BEGIN
         c.source_name,
         c.source_category,
         c.published_at,
-        1 - (c.embedding <=> query_embedding) AS similarity
-    FROM chunks c
-    WHERE 
-        1 - (c.embedding <=> query_embedding) > match_threshold
-        AND (filter_source IS NULL OR c.source_name = filter_source)
-        AND (filter_category IS NULL OR c.source_category = filter_category)
-    ORDER BY c.embedding <=> query_embedding
-    LIMIT match_count;
-END;
+        1 - c.distance AS similarity
+    FROM (
+        SELECT
+            ch.id,
+            ch.article_id,
+            ch.chunk_index,
+            ch.text,
+            ch.article_title,
+            ch.article_url,
+            ch.source_name,
+            ch.source_category,
+            ch.published_at,
+            ch.embedding <=> query_embedding AS distance
+        FROM chunks ch
+        WHERE 
+            (filter_source IS NULL OR ch.source_name = filter_source)
+            AND (filter_category IS NULL OR ch.source_category = filter_category)
+        ORDER BY distance
+        LIMIT match_count
+    ) c
+    WHERE 1 - c.distance > match_threshold
+    ORDER BY c.distance;
+$$;
+
+-- Article count per source, for get_stats
+CREATE OR REPLACE FUNCTION source_breakdown()
+RETURNS TABLE (source_name text, article_count bigint)
+LANGUAGE sql STABLE
+AS $$
+    SELECT a.source_name, count(*) FROM articles a GROUP BY a.source_name;
 $$;
 """
 
 
+def vector_literal(embedding) -> str:
+    """
+    Format an embedding as a pgvector text literal ('[0.1,0.2,...]').
+
+    orjson writes float32 values at their shortest round-trip precision, so
+    the payload is much smaller than json-encoding the widened Python floats.
+    The halfvec column rounds them to float16 on input.
+    """
+    return orjson.dumps(
+        np.ascontiguousarray(embedding, dtype=np.float32), option=orjson.OPT_SERIALIZE_NUMPY
+    ).decode()
+
+
 # =============================================================================
 # SUPABASE STORAGE CLASS
 # =============================================================================
@@ -136,6 +200,16 @@ class SupabaseStorage:
         results = storage.search_similar(query_embedding)
     """
     
+    # Rows per upsert request: 100 chunk rows with their vectors come to
+    # roughly 1.5 MB of JSON
+    UPSERT_BATCH_SIZE = 100
+    
+    # Upsert requests in flight at once
+    UPSERT_CONCURRENCY = 4
+    
+    # IDs per id=in.(...) lookup, keeping request URLs short
+    ID_LOOKUP_BATCH_SIZE = 100
+    
     def __init__(self, url: str = None, key: str = None):
         """
         Initialize Supabase connection.
@@ -176,19 +250,10 @@ class SupabaseStorage:
     # Article Operations
     # -------------------------------------------------------------------------
     
-    def store_article(self, article) -> bool:
-        """
-        Store a single article.
-        
-        Args:
-            article: Article object
-        
-        Returns:
-            True if successful
-        """
-        client = self._get_client()
-        
-        data = {
+    @staticmethod
+    def _article_row(article) -> dict:
+        """Convert an Article to an articles table row."""
+        return {
             "id": article.id,
             "title": article.title,
             "url": article.url,
@@ -198,19 +263,23 @@ class SupabaseStorage:
             "source_name": article.source_name,
             "source_category": article.source_category,
             "source_priority": article.source_priority,
-            "authors": json.dumps(article.authors),
-            "tags": json.dumps(article.tags),
+            "authors": article.authors,
+            "tags": article.tags,
             "keywords": getattr(article, "keywords", []) or [],
             "fetched_at": article.fetched_at.isoformat(),
         }
+    
+    def store_article(self, article) -> bool:
+        """
+        Store a single article.
         
-        try:
-            # Upsert (insert or update)
-            result = client.table("articles").upsert(data).execute()
-            return True
-        except Exception as e:
-            logger.error(f"Failed to store article {article.id}: {e}")
-            return False
+        Args:
+            article: Article object
+        
+        Returns:
+            True if successful
+        """
+        return self._upsert_rows("articles", [self._article_row(article)]) == 1
     
     def store_articles(self, articles: list) -> int:
         """
@@ -222,22 +291,43 @@ class SupabaseStorage:
         Returns:
             Number of successfully stored articles
         """
-        success_count = 0
-        
-        for article in articles:
-            if self.store_article(article):
-                success_count += 1
+        success_count = self._upsert_rows("articles", [self._article_row(a) for a in articles])
         
         logger.info(f"Stored {success_count}/{len(articles)} articles")
         return success_count
     
-    def get_existing_article_ids(self) -> set[str]:
-        """Get set of article IDs already in database."""
+    def get_existing_article_ids(self, article_ids: list[str] = None) -> set[str]:
+        """
+        Get set of article IDs already in database.
+        
+        Args:
+            article_ids: Only check these IDs (looked up ID_LOOKUP_BATCH_SIZE
+                at a time) instead of listing every article
+        """
         client = self._get_client()
         
         try:
-            result = client.table("articles").select("id").execute()
-            return {row["id"] for row in result.data}
+            if article_ids is not None:
+                existing = set()
+                unique_ids = list(dict.fromkeys(article_ids))
+                for i in range(0, len(unique_ids), self.ID_LOOKUP_BATCH_SIZE):
+                    batch = unique_ids[i:i + self.ID_LOOKUP_BATCH_SIZE]
+                    result = client.table("articles").select("id").in_("id", batch).execute()
+                    existing.update(row["id"] for row in result.data)
+                return existing
+            
+            # Page by id: PostgREST caps a single response at 1000 rows
+            existing = set()
+            last_id = None
+            while True:
+                query = client.table("articles").select("id").order("id").limit(1000)
+                if last_id is not None:
+                    query = query.gt("id", last_id)
+                rows = query.execute().data
+                existing.update(row["id"] for row in rows)
+                if len(rows) < 1000:
+                    return existing
+                last_id = rows[-1]["id"]
         except Exception as e:
             logger.error(f"Failed to get existing article IDs: {e}")
             return set()
@@ -246,37 +336,33 @@ class SupabaseStorage:
     # Chunk Operations
     # -------------------------------------------------------------------------
     
-    def store_embedded_chunk(self, chunk) -> bool:
-        """
-        Store a single embedded chunk.
-        
-        Args:
-            chunk: EmbeddedChunk object
-        
-        Returns:
-            True if successful
-        """
-        client = self._get_client()
-        
-        data = {
+    @staticmethod
+    def _chunk_row(chunk) -> dict:
+        """Convert an EmbeddedChunk to a chunks table row."""
+        return {
             "id": chunk.chunk_id,
             "article_id": chunk.article_id,
             "chunk_index": chunk.chunk_index,
             "text": chunk.text,
-            "embedding": chunk.embedding,  # Supabase handles vector conversion
+            "embedding": vector_literal(chunk.embedding),
             "article_title": chunk.article_title,
             "article_url": chunk.article_url,
             "source_name": chunk.source_name,
             "source_category": chunk.source_category,
             "published_at": chunk.published_at,
         }
+    
+    def store_embedded_chunk(self, chunk) -> bool:
+        """
+        Store a single embedded chunk.
         
-        try:
-            result = client.table("chunks").upsert(data).execute()
-            return True
-        except Exception as e:
-            logger.error(f"Failed to store chunk {chunk.chunk_id}: {e}")
-            return False
+        Args:
+            chunk: EmbeddedChunk object
+        
+        Returns:
+            True if successful
+        """
+        return self._upsert_rows("chunks", [self._chunk_row(chunk)]) == 1
     
     def store_embedded_chunks(self, chunks: list) -> int:
         """
@@ -288,15 +374,55 @@ class SupabaseStorage:
         Returns:
             Number of successfully stored chunks
         """
-        success_count = 0
-        
-        for chunk in chunks:
-            if self.store_embedded_chunk(chunk):
-                success_count += 1
+        success_count = self._upsert_rows("chunks", [self._chunk_row(c) for c in chunks])
         
         logger.info(f"Stored {success_count}/{len(chunks)} chunks")
         return success_count
     
+    def _upsert_rows(self, table: str, rows: list[dict]) -> int:
+        """
+        Upsert rows UPSERT_BATCH_SIZE at a time and return how many were stored.
+        
+        Rows are deduplicated by id first (the last one wins, as it would
+        with one upsert per row): a single upsert can't touch a row twice,
+        and batches run concurrently, so no two may share a row either.
+        """
+        client = self._get_client()
+        rows = list({row["id"]: row for row in rows}.values())
+        batches = [rows[i:i + self.UPSERT_BATCH_SIZE] for i in range(0, len(rows), self.UPSERT_BATCH_SIZE)]
+        if len(batches) <= 1:
+            return sum(self._upsert_batch(client, table, batch) for batch in batches)
+        
+        # Network-bound: overlap the requests' round-trips on the shared client
+        with ThreadPoolExecutor(max_workers=min(self.UPSERT_CONCURRENCY, len(batches))) as pool:
+            return sum(pool.map(lambda batch: self._upsert_batch(client, table, batch), batches))
+    
+    @staticmethod
+    def _upsert_batch(client, table: str, batch: list[dict]) -> int:
+        """
+        Upsert one batch and return how many rows were stored.
+        
+        A batch that fails is retried row by row, so a bad row only loses
+        itself.
+        """
+        try:
+            client.table(table).upsert(batch, returning="minimal").execute()
+            return len(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error(f"Failed to store {table} row {batch[0]['id']}: {e}")
+                return 0
+            logger.warning(f"Batch upsert of {len(batch)} {table} rows failed, retrying one by one: {e}")
+        
+        stored = 0
+        for row in batch:
+            try:
+                client.table(table).upsert(row, returning="minimal").execute()
+                stored += 1
+            except Exception as e:
+                logger.error(f"Failed to store {table} row {row['id']}: {e}")
+        return stored
+    
     # -------------------------------------------------------------------------
     # Search Operations
     # -------------------------------------------------------------------------
@@ -353,19 +479,15 @@ class SupabaseStorage:
         
         try:
             # Count articles
-            articles_result = client.table("articles").select("id", count="exact").execute()
+            articles_result = client.table("articles").select("id", count="exact", head=True).execute()
             article_count = articles_result.count
             
             # Count chunks
-            chunks_result = client.table("chunks").select("id", count="exact").execute()
+            chunks_result = client.table("chunks").select("id", count="exact", head=True).execute()
             chunk_count = chunks_result.count
             
             # Get source breakdown
-            source_result = client.table("articles").select("source_name").execute()
-            source_counts = {}
-            for row in source_result.data:
-                source = row["source_name"]
-                source_counts[source] = source_counts.get(source, 0) + 1
+            source_counts = self._source_counts(client)
             
             return {
                 "total_articles": article_count,
@@ -377,6 +499,32 @@ class SupabaseStorage:
             logger.error(f"Failed to get stats: {e}")
             return {}
 
+    @staticmethod
+    def _source_counts(client) -> dict[str, int]:
+        """
+        Count articles per source with the source_breakdown RPC (see
+        SCHEMA_SQL), falling back to counting every article's source_name
+        locally if it isn't installed.
+        """
+        try:
+            result = client.rpc("source_breakdown", {}).execute()
+            return {row["source_name"]: row["article_count"] for row in result.data}
+        except Exception as e:
+            logger.warning(f"source_breakdown RPC unavailable, counting source names instead: {e}")
+        
+        # Page by id: PostgREST caps a single response at 1000 rows
+        counts = Counter()
+        last_id = None
+        while True:
+            query = client.table("articles").select("id, source_name").order("id").limit(1000)
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            rows = query.execute().data
+            counts.update(row["source_name"] for row in rows)
+            if len(rows) < 1000:
+                return dict(counts)
+            last_id = rows[-1]["id"]
+    
     # -------------------------------------------------------------------------
     # Maintenance
     # -------------------------------------------------------------------------
@@ -429,60 +577,127 @@ class LocalStorage:
     """
     Local JSON-based storage for testing.
     Stores data in local files instead of Supabase.
+    
+    Articles and chunks are kept as JSON Lines (one object per line), so
+    storing new rows appends to the file instead of rewriting all of it.
+    
+    Chunk embeddings are not kept in the JSON: each is unit-normalised and
+    appended as a float16 row to a raw binary sidecar (embeddings.f16), and
+    the chunk's line records its row as "embedding_row". Searching then
+    memory-maps the sidecar instead of parsing 1536 numbers per chunk.
     """
     
     def __init__(self, data_dir: str = "./data"):
-        import os
         self.data_dir = data_dir
         os.makedirs(data_dir, exist_ok=True)
         
-        self.articles_file = f"{data_dir}/articles.json"
-        self.chunks_file = f"{data_dir}/chunks.json"
+        self.articles_file = f"{data_dir}/articles.jsonl"
+        self.chunks_file = f"{data_dir}/chunks.jsonl"
+        self.embeddings_file = f"{data_dir}/embeddings.f16"
         
-        # Initialize files if they don't exist
+        # Initialize files if they don't exist, carrying over data stored
+        # by older versions as a single JSON array
         for file in [self.articles_file, self.chunks_file]:
             if not os.path.exists(file):
-                with open(file, 'w') as f:
-                    json.dump([], f)
+                legacy_file = file[:-1]
+                rows = self._load_legacy_json(legacy_file) if os.path.exists(legacy_file) else []
+                with open(file, 'wb') as f:
+                    f.writelines(self._jsonl_line(row) for row in rows)
+        
+        # Move embeddings stored inline by older versions into the sidecar
+        if not os.path.exists(self.embeddings_file):
+            open(self.embeddings_file, 'wb').close()
+            chunks = self._load_json(self.chunks_file)
+            if any("embedding" in c for c in chunks):
+                self._append_embeddings(chunks)
+                with open(self.chunks_file, 'wb') as f:
+                    f.writelines(self._jsonl_line(c) for c in chunks)
+        
+        # IDs already in each file, loaded on first store
+        self._article_ids: Optional[set[str]] = None
+        self._chunk_ids: Optional[set[str]] = None
+        
+        # (chunks with embeddings, unit-normalised embedding matrix), and the
+        # chunks file (mtime, size) it was built from
+        self._chunk_matrix_cache: Optional[tuple[list[dict], np.ndarray]] = None
+        self._chunk_matrix_key: Optional[tuple[int, int]] = None
+    
+    @staticmethod
+    def _load_legacy_json(filepath: str) -> list:
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
+    
+    @staticmethod
+    def _jsonl_line(row: dict) -> bytes:
+        return orjson.dumps(row, default=str, option=orjson.OPT_APPEND_NEWLINE)
     
     def _load_json(self, filepath: str) -> list:
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        with open(filepath, 'rb') as f:
+            return [orjson.loads(line) for line in f if line.strip()]
+    
+    def _append_json(self, filepath: str, rows: list):
+        with open(filepath, 'ab') as f:
+            f.writelines(self._jsonl_line(row) for row in rows)
+    
+    def _embedding_rows(self) -> int:
+        """Number of embeddings in the sidecar (0 if it has gone missing)."""
+        row_bytes = EMBEDDING_CONFIG.dimensions * np.dtype(np.float16).itemsize
+        try:
+            return os.path.getsize(self.embeddings_file) // row_bytes
+        except FileNotFoundError:
+            return 0
     
-    def _save_json(self, filepath: str, data: list):
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+    def _append_embeddings(self, chunk_dicts: list):
+        """
+        Move each chunk dict's "embedding" into the sidecar, replacing it
+        with the "embedding_row" it was written to.
+        """
+        embedded = [c for c in chunk_dicts if c.get("embedding")]
+        if embedded:
+            matrix = np.array([c["embedding"] for c in embedded], dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            np.divide(matrix, norms, out=matrix, where=norms > 0)
+            
+            first_row = self._embedding_rows()
+            with open(self.embeddings_file, 'ab') as f:
+                f.write(matrix.astype(np.float16).tobytes())
+            for row, c in enumerate(embedded, start=first_row):
+                c["embedding_row"] = row
+        
+        for c in chunk_dicts:
+            c.pop("embedding", None)
     
     def store_articles(self, articles: list) -> int:
         """Store articles to local JSON."""
-        existing = self._load_json(self.articles_file)
-        existing_ids = {a["id"] for a in existing}
+        if self._article_ids is None:
+            self._article_ids = {a["id"] for a in self._load_json(self.articles_file)}
         
         new_articles = []
         for article in articles:
             article_dict = article.to_dict()
-            if article_dict["id"] not in existing_ids:
+            if article_dict["id"] not in self._article_ids:
+                self._article_ids.add(article_dict["id"])
                 new_articles.append(article_dict)
         
-        existing.extend(new_articles)
-        self._save_json(self.articles_file, existing)
+        self._append_json(self.articles_file, new_articles)
         
         logger.info(f"Stored {len(new_articles)} new articles locally")
         return len(new_articles)
     
     def store_embedded_chunks(self, chunks: list) -> int:
         """Store chunks to local JSON."""
-        existing = self._load_json(self.chunks_file)
-        existing_ids = {c["chunk_id"] for c in existing}
+        if self._chunk_ids is None:
+            self._chunk_ids = {c["chunk_id"] for c in self._load_json(self.chunks_file)}
         
         new_chunks = []
         for chunk in chunks:
             chunk_dict = chunk.to_dict()
-            if chunk_dict["chunk_id"] not in existing_ids:
+            if chunk_dict["chunk_id"] not in self._chunk_ids:
+                self._chunk_ids.add(chunk_dict["chunk_id"])
                 new_chunks.append(chunk_dict)
         
-        existing.extend(new_chunks)
-        self._save_json(self.chunks_file, existing)
+        self._append_embeddings(new_chunks)
+        self._append_json(self.chunks_file, new_chunks)
         
         logger.info(f"Stored {len(new_chunks)} new chunks locally")
         return len(new_chunks)
@@ -494,48 +709,84 @@ class LocalStorage:
         match_threshold: float = 0.7,
         **kwargs
     ) -> list[dict]:
-        """Search using cosine similarity."""
-        import math
-        
-        def cosine_similarity(a, b):
-            dot_product = sum(x * y for x, y in zip(a, b))
-            magnitude_a = math.sqrt(sum(x * x for x in a))
-            magnitude_b = math.sqrt(sum(y * y for y in b))
-            if magnitude_a == 0 or magnitude_b == 0:
-                return 0
-            return dot_product / (magnitude_a * magnitude_b)
+        """
+        Search using cosine similarity.
         
-        chunks = self._load_json(self.chunks_file)
+        Embeddings are stored as float16, so similarities are approximate:
+        measured against exact float64 cosine they are off by up to about
+        2e-5. Chunks whose similarities differ by less than that may rank
+        in either order, and one within that of match_threshold may fall on
+        either side of it.
+        """
+        chunks, matrix = self._chunk_matrix()
+        
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        similarities = matrix @ (query / norm) if norm else np.zeros(len(chunks), dtype=np.float32)
+        
+        hits = np.flatnonzero(similarities >= match_threshold)
+        if 0 < match_count < len(hits):
+            # Partition out the top match_count first so only those get sorted,
+            # keeping every hit tied with the last one so the stable sort
+            # below still picks ties in file order
+            kth = np.partition(similarities[hits], len(hits) - match_count)[len(hits) - match_count]
+            hits = hits[similarities[hits] >= kth]
+
+        # Sort by similarity and limit (stable, so ties keep file order)
+        hits = hits[np.argsort(-similarities[hits], kind="stable")][:match_count]
+        return [{**chunks[i], "similarity": float(similarities[i])} for i in hits]
+    
+    def _chunk_matrix(self) -> tuple[list[dict], np.ndarray]:
+        """
+        Return the stored chunks that have embeddings, and their embeddings
+        as a unit-normalised float32 matrix (one row per chunk), so cosine
+        similarity against every chunk is a single matrix-vector product.
         
-        # Calculate similarities
-        results = []
-        for chunk in chunks:
-            if "embedding" in chunk and chunk["embedding"]:
-                similarity = cosine_similarity(query_embedding, chunk["embedding"])
-                if similarity >= match_threshold:
-                    results.append({
-                        **chunk,
-                        "similarity": similarity
-                    })
-        
-        # Sort by similarity and limit
-        results.sort(key=lambda x: x["similarity"], reverse=True)
-        return results[:match_count]
+        Cached until the chunks file changes.
+        """
+        stat = os.stat(self.chunks_file)
+        key = (stat.st_mtime_ns, stat.st_size)
+        if self._chunk_matrix_key != key:
+            chunks = [c for c in self._load_json(self.chunks_file) if "embedding_row" in c]
+            
+            # A sidecar deleted, truncated or left behind by a failed write
+            # can lack rows the chunks file points at; search the rest
+            available = self._embedding_rows()
+            missing = [c for c in chunks if not 0 <= c["embedding_row"] < available]
+            if missing:
+                logger.warning(
+                    f"{self.embeddings_file} has {available} embeddings but chunks reference "
+                    f"row {max(c['embedding_row'] for c in missing)}; skipping {len(missing)} "
+                    f"chunks without one"
+                )
+                chunks = [c for c in chunks if 0 <= c["embedding_row"] < available]
+            
+            if chunks:
+                sidecar = np.memmap(
+                    self.embeddings_file, dtype=np.float16, mode='r',
+                    shape=(available, EMBEDDING_CONFIG.dimensions),
+                )
+                rows = np.array([c["embedding_row"] for c in chunks], dtype=np.intp)
+                # Rows are stored unit-normalised; widen once since float16
+                # matmul has no BLAS path
+                matrix = sidecar[rows].astype(np.float32)
+            else:
+                matrix = np.empty((0, EMBEDDING_CONFIG.dimensions), dtype=np.float32)
+            self._chunk_matrix_cache = (chunks, matrix)
+            self._chunk_matrix_key = key
+        return self._chunk_matrix_cache
     
     def get_stats(self) -> dict:
         """Get local storage statistics."""
         articles = self._load_json(self.articles_file)
         chunks = self._load_json(self.chunks_file)
         
-        source_counts = {}
-        for article in articles:
-            source = article.get("source_name", "unknown")
-            source_counts[source] = source_counts.get(source, 0) + 1
+        source_counts = Counter(article.get("source_name", "unknown") for article in articles)
         
         return {
             "total_articles": len(articles),
             "total_chunks": len(chunks),
-            "sources": source_counts,
+            "sources": dict(source_counts),
         }
 
 
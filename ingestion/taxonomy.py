@@ -4,6 +4,8 @@ Each keyword has a list of synonyms/variations that should map to it.
 During classification, if any synonym is found, the article gets tagged with the main keyword.
 """
 
+import ahocorasick
+
 TAXONOMY = {
     # === AI Companies & Models ===
     "OpenAI": [
@@ -152,6 +154,21 @@ TAXONOMY = {
 }
 
 
+# Every synonym (lowercase) compiled into one Aho-Corasick automaton, so
+# classify_text finds all of them in a single pass over the text. Each
+# synonym maps to the keywords listing it, as indexes into TAXONOMY order.
+_SYNONYM_KEYWORDS: dict[str, list[int]] = {}
+for _index, _synonyms in enumerate(TAXONOMY.values()):
+    for _synonym in _synonyms:
+        _SYNONYM_KEYWORDS.setdefault(_synonym.lower(), []).append(_index)
+
+_KEYWORDS = list(TAXONOMY)
+_SYNONYM_AUTOMATON = ahocorasick.Automaton()
+for _synonym, _indexes in _SYNONYM_KEYWORDS.items():
+    _SYNONYM_AUTOMATON.add_word(_synonym, tuple(_indexes))
+_SYNONYM_AUTOMATON.make_automaton()
+
+
 def get_all_keywords() -> list[str]:
     """Return list of all main keywords."""
     return list(TAXONOMY.keys())
@@ -167,13 +184,9 @@ def classify_text(text: str) -> list[str]:
     Simple keyword matching classification.
     Returns list of keywords found in the text.
     """
-    text_lower = text.lower()
-    matched_keywords = []
-
-    for keyword, synonyms in TAXONOMY.items():
-        for synonym in synonyms:
-            if synonym.lower() in text_lower:
-                matched_keywords.append(keyword)
-                break  # Only add each keyword once
+    matched = set()
+    for _, indexes in _SYNONYM_AUTOMATON.iter(text.lower()):
+        matched.update(indexes)
 
-    return matched_keywords
+    # Only add each keyword once, in taxonomy order
+    return [_KEYWORDS[i] for i in sorted(matched)]
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Tests for topic merging in analyze_topics.
+
+merge_topics must merge exactly like the original pairwise scan below, which
+compared every topic against every canonical name in order.
+"""
+
+import random
+
+from analyze_topics import _SubstringIndex, merge_topics
+
+
+def pairwise_merge(all_batch_results):
+    """The original O(n^2) merge_topics (blank names skipped)."""
+    topic_map = {}
+    for batch_result in all_batch_results:
+        for topic in batch_result.get("topics", []):
+            name = topic["name"].strip().lower()
+            if not name:
+                continue
+            data = topic_map.setdefault(name, {"count": 0, "examples": set()})
+            data["count"] += topic.get("count", 1)
+            data["examples"].update(topic.get("examples", []))
+
+    canonical = {}
+    for name in sorted(topic_map.keys()):
+        merged = False
+        for canon in list(canonical.keys()):
+            if name in canon or canon in name:
+                canonical[canon]["count"] += topic_map[name]["count"]
+                canonical[canon]["examples"].update(topic_map[name]["examples"])
+                merged = True
+                break
+            name_words = set(name.split())
+            canon_words = set(canon.split())
+            if len(name_words) >= 2 and len(canon_words) >= 2:
+                overlap = name_words & canon_words
+                if len(overlap) >= min(len(name_words), len(canon_words)):
+                    if len(name) < len(canon):
+                        canonical[name] = canonical.pop(canon)
+                        canonical[name]["count"] += topic_map[name]["count"]
+                        canonical[name]["examples"].update(topic_map[name]["examples"])
+                    else:
+                        canonical[canon]["count"] += topic_map[name]["count"]
+                        canonical[canon]["examples"].update(topic_map[name]["examples"])
+                    merged = True
+                    break
+        if not merged:
+            canonical[name] = topic_map[name]
+
+    topics = [
+        {"name": name.title(), "count": data["count"], "examples": sorted(data["examples"])[:5]}
+        for name, data in canonical.items()
+    ]
+    topics.sort(key=lambda t: t["count"], reverse=True)
+    return topics
+
+
+def random_batches(rng, words, n_topics):
+    batches = []
+    for _ in range(n_topics // 10):
+        topics = []
+        for _ in range(10):
+            # Mostly short names, some with repeated words, a few longer than
+            # MAX_TOPIC_WORDS
+            size = rng.choice([1, 2, 2, 3, 3, 4, 5, 7, 9])
+            name = " ".join(rng.choice(words) for _ in range(size))
+            topics.append({
+                "name": name if rng.random() < 0.9 else f"  {name.upper()} ",
+                "count": rng.randint(1, 4),
+                "examples": [f"article {rng.randint(0, 30)}"],
+            })
+        batches.append({"topics": topics})
+    return batches
+
+
+def test_merge_matches_pairwise_scan():
+    rng = random.Random(0)
+    vocabularies = [
+        ["ai", "safety", "research", "agents", "llm", "open", "source"],
+        ["a", "ab", "b", "ba", "abc", "c"],  # short words, so substrings are everywhere
+        ["model", "models", "chip", "chips", "funding", "policy", "eu", "us", ""],
+    ]
+    for words in vocabularies:
+        for n_topics in (10, 50, 200, 600):
+            for _ in range(10):
+                batches = random_batches(rng, words, n_topics)
+                assert merge_topics(batches) == pairwise_merge(batches)
+
+
+def test_earliest_canonical_wins_across_both_tests():
+    # "x s b" contains the earlier canonical "s" and all the words of the
+    # later "x b"; the earlier one wins
+    batches = [{"topics": [{"name": "x s b"}, {"name": "x b"}, {"name": "s"}]}]
+    assert merge_topics(batches) == [
+        {"name": "S", "count": 2, "examples": []},
+        {"name": "X B", "count": 1, "examples": []},
+    ]
+
+
+def test_substring_match_keeps_canonical_name():
+    # "b s" is inside "b b s", so the longer canonical name is kept even
+    # though their words also overlap
+    batches = [{"topics": [{"name": "b b s"}, {"name": "b s"}]}]
+    assert merge_topics(batches) == [{"name": "B B S", "count": 2, "examples": []}]
+
+
+def test_renamed_canonical_moves_last_among_ties():
+    # "la x b" becomes canonical before "s", then is renamed to the shorter
+    # "x x b" (a word-overlap match), which moves it after "s" among equal
+    # counts
+    batches = [{"topics": [{"name": "s"}, {"name": "s"}, {"name": "la x b"}, {"name": "x x b"}]}]
+    assert merge_topics(batches) == [
+        {"name": "S", "count": 2, "examples": []},
+        {"name": "X X B", "count": 2, "examples": []},
+    ]
+
+
+def test_long_names_match_on_word_subsets():
+    # Neither is a substring of the 8-word name; both share all their words
+    # with it
+    batches = [{"topics": [
+        {"name": "open source large language model release news today"},
+        {"name": "release model"},
+        {"name": "today news open source large language model release roundup"},
+    ]}]
+    assert merge_topics(batches) == [{"name": "Release Model", "count": 3, "examples": []}]
+
+
+def test_blank_names_are_skipped():
+    batches = [{"topics": [{"name": "  "}, {"name": "ai agents"}, {"name": "robotics"}]}]
+    assert [t["name"] for t in merge_topics(batches)] == ["Ai Agents", "Robotics"]
+
+
+def earliest_match(names, query):
+    """Reference _SubstringIndex.find: scan live names in insertion order."""
+    return next((entry for name, entry in names.items() if query in name or name in query), None)
+
+
+def test_substring_index_matches_scan():
+    rng = random.Random(0)
+    # The separator, multi-byte characters and short repeats all show up
+    alphabet = ["a", "b", "ab", " ", "\n", "é", "日本"]
+    for _ in range(200):
+        index = _SubstringIndex()
+        names = {}  # live name -> entry, in dict (= canonical) order
+        for step in range(rng.randint(1, 40)):
+            query = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 5)))
+            assert index.find(query) is earliest_match(names, query)
+            if query in names:
+                continue
+            if names and rng.random() < 0.3:
+                # Rename a random entry, moving it to the end
+                old = rng.choice(list(names))
+                entry = names.pop(old)
+                index.remove(old)
+                names[query] = entry
+                index.add(query, entry)
+            else:
+                entry = {"name": query, "step": step}
+                names[query] = entry
+                index.add(query, entry)
+
+
+def test_substring_index_separator_edge_cases():
+    index = _SubstringIndex()
+    first, second = {"n": 1}, {"n": 2}
+    index.add("ai", first)
+    index.add("safety", second)
+
+    assert _SubstringIndex().find("ai") is None
+    # Spans the separator between the two names in the haystack
+    assert index.find("ai\nsafety") is first  # contains "ai"
+    assert index.find("i\ns") is None
+    # A name containing the separator is still matched as one name
+    third = {"n": 3}
+    index.add("open\nsource", third)
+    assert index.find("n\ns") is third
+    assert index.find("source") is third
+    # Removed names are skipped, and a re-added name counts as newest
+    index.remove("ai")
+    assert index.find("a") is second
+    index.add("ai", first)
+    assert index.find("a") is second
+    assert index.find("xai") is first
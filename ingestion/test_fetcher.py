@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Tests for the lxml feed parser in fetcher.
+
+Well-formed RSS 2.0, RSS 1.0 and Atom 1.0 feeds are parsed by
+_parse_feed_lxml; the Articles built from its entries must match the ones
+built from feedparser's. Anything else must be left to feedparser.
+"""
+
+import calendar
+from dataclasses import asdict
+from datetime import datetime
+
+import feedparser
+
+from config import FeedSource
+from fetcher import _load_feed_entries, _parse_entry_metadata, _parse_feed_lxml
+
+SOURCE = FeedSource(name="Test Feed", url="https://example.com/feed", category="research", priority="high")
+
+LONG_TEXT = "Researchers released a new open model for reasoning tasks. " * 6
+
+RSS2_FEED = f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"
+     xmlns:content="http://purl.org/rss/1.0/modules/content/"
+     xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <channel>
+    <title>Example</title>
+    <link>https://example.com/</link>
+    <item>
+      <title>First post</title>
+      <link>https://example.com/old-link</link>
+      <link>https://example.com/first</link>
+      <description><![CDATA[<p>Short <b>summary</b>.</p>]]></description>
+      <content:encoded><![CDATA[<p>{LONG_TEXT}</p>]]></content:encoded>
+      <author>first@example.com (First Author)</author>
+      <dc:creator>Second Author</dc:creator>
+      <category>AI</category>
+      <category domain="https://example.com/tags">Research</category>
+      <category>AI</category>
+      <pubDate>Tue, 02 Jan 2024 10:30:00 +0200</pubDate>
+    </item>
+    <item>
+      <title>Guid only</title>
+      <guid>https://example.com/from-guid</guid>
+      <content:encoded><![CDATA[<p>Only content here.</p>]]></content:encoded>
+      <dc:date>2024-01-03T08:00:00Z</dc:date>
+    </item>
+    <item>
+      <title>Not a permalink</title>
+      <guid isPermaLink="false">tag:example.com,2024:3</guid>
+      <description>No link at all.</description>
+    </item>
+  </channel>
+</rss>
+""".encode()
+
+RSS1_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns="http://purl.org/rss/1.0/"
+         xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <channel rdf:about="https://example.org/">
+    <title>Example RDF</title>
+    <link>https://example.org/</link>
+  </channel>
+  <item rdf:about="https://example.org/paper">
+    <title>A paper</title>
+    <link>https://example.org/paper</link>
+    <description>Abstract of the paper.</description>
+    <dc:creator>Ada Lovelace</dc:creator>
+    <dc:subject>cs.AI</dc:subject>
+    <dc:date>2024-02-01T12:00:00+01:00</dc:date>
+  </item>
+</rdf:RDF>
+"""
+
+ATOM_FEED = f"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example Atom</title>
+  <id>urn:example</id>
+  <updated>2024-03-01T00:00:00Z</updated>
+  <entry>
+    <title type="html">Atom &amp;amp; entry</title>
+    <id>urn:example:1</id>
+    <link rel="self" href="https://example.net/self"/>
+    <link rel="alternate" type="application/pdf" href="https://example.net/paper.pdf"/>
+    <link rel="alternate" type="text/html" href="https://example.net/first"/>
+    <link href="https://example.net/entry"/>
+    <author><name>Grace Hopper</name><email>grace@example.net</email></author>
+    <category term="agents" scheme="https://example.net/cats" label="Agents"/>
+    <category term="agents" scheme="https://example.net/cats" label="Agents"/>
+    <category term="policy"/>
+    <summary>Entry summary.</summary>
+    <content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>{LONG_TEXT}</p></div></content>
+    <published>2024-03-01T09:00:00-05:00</published>
+    <updated>2024-03-02T09:00:00Z</updated>
+  </entry>
+  <entry>
+    <title>Updated only</title>
+    <id>urn:example:2</id>
+    <link rel="alternate" href="https://example.net/second"/>
+    <author><email>only@example.net</email></author>
+    <content type="html">&lt;p&gt;Escaped &lt;em&gt;HTML&lt;/em&gt; content.&lt;/p&gt;</content>
+    <updated>2024-03-05T10:00:00Z</updated>
+  </entry>
+</feed>
+""".encode()
+
+
+def articles(entries):
+    """Articles built from entries, without the per-run fetch time."""
+    built = []
+    for entry in entries:
+        parsed = _parse_entry_metadata(entry, SOURCE)
+        if parsed is None:
+            built.append(None)
+            continue
+        article, summary_from_content = parsed
+        fields = asdict(article)
+        del fields["fetched_at"]
+        built.append((fields, summary_from_content))
+    return built
+
+
+def assert_matches_feedparser(body):
+    entries = _parse_feed_lxml(body)
+    assert entries is not None
+    assert articles(entries) == articles(feedparser.parse(body).entries)
+    return entries
+
+
+def utc(struct):
+    return datetime.utcfromtimestamp(calendar.timegm(struct))
+
+
+def test_rss2():
+    first, guid_only, no_link = assert_matches_feedparser(RSS2_FEED)
+
+    assert first["title"] == "First post"
+    assert first["link"] == "https://example.com/first"  # the last link wins
+    assert first["author"] == "Second Author"  # so does the last author
+    assert [t["term"] for t in first["tags"]] == ["AI", "Research"]
+    assert first["tags"][1]["scheme"] == "https://example.com/tags"
+    assert first["summary"] == "<p>Short <b>summary</b>.</p>"
+    assert first["content"][0]["value"] == f"<p>{LONG_TEXT}</p>"
+    assert utc(first["published_parsed"]) == datetime(2024, 1, 2, 8, 30)
+
+    assert guid_only["link"] == "https://example.com/from-guid"
+    assert guid_only["summary"] == "<p>Only content here.</p>"
+    assert utc(guid_only["updated_parsed"]) == datetime(2024, 1, 3, 8, 0)
+
+    assert "link" not in no_link  # isPermaLink="false" guids are not URLs
+    assert articles([no_link]) == [None]
+
+
+def test_rss1():
+    (paper,) = assert_matches_feedparser(RSS1_FEED)
+
+    assert paper["link"] == "https://example.org/paper"
+    assert paper["summary"] == "Abstract of the paper."
+    assert paper["author"] == "Ada Lovelace"
+    assert [t["term"] for t in paper["tags"]] == ["cs.AI"]
+    assert utc(paper["updated_parsed"]) == datetime(2024, 2, 1, 11, 0)
+
+
+def test_atom():
+    first, second = assert_matches_feedparser(ATOM_FEED)
+
+    assert first["title"] == "Atom &amp; entry"
+    assert first["link"] == "https://example.net/entry"  # last alternate HTML link
+    assert first["author"] == "Grace Hopper (grace@example.net)"
+    assert first["tags"] == [
+        {"term": "agents", "scheme": "https://example.net/cats", "label": "Agents"},
+        {"term": "policy", "scheme": None, "label": None},
+    ]
+    assert first["summary"] == "Entry summary."
+    assert first["content"][0]["value"] == f'<p xmlns="http://www.w3.org/1999/xhtml">{LONG_TEXT}</p>'
+    assert utc(first["published_parsed"]) == datetime(2024, 3, 1, 14, 0)
+    assert utc(first["updated_parsed"]) == datetime(2024, 3, 2, 9, 0)
+
+    assert second["link"] == "https://example.net/second"
+    assert second["author"] == "only@example.net"
+    assert second["summary"] == "<p>Escaped <em>HTML</em> content.</p>"
+    assert "published_parsed" not in second
+
+
+def test_fallback_to_feedparser():
+    doctype = RSS1_FEED.replace(
+        b'<rdf:RDF', b'<!DOCTYPE rdf:RDF [<!ENTITY site "https://example.org">]>\n<rdf:RDF', 1
+    )
+    malformed = RSS2_FEED.replace(b"<title>First post</title>", b"<title>Q&A post</title>")
+    unknown_root = b'<?xml version="1.0"?><opml version="2.0"><body/></opml>'
+    broken = b"not xml at all"
+
+    for body in (doctype, malformed, unknown_root, broken):
+        assert _parse_feed_lxml(body) is None
+
+    # feedparser still recovers the entries the strict parser refuses
+    (paper,) = _load_feed_entries(SOURCE, 10, feed_body=doctype, feed_headers={})
+    assert paper["link"] == "https://example.org/paper"
+    entries = _load_feed_entries(SOURCE, 10, feed_body=malformed, feed_headers={})
+    assert [e.get("link") for e in entries] == ["https://example.com/first", "https://example.com/from-guid", None]
+    assert _load_feed_entries(SOURCE, 10, feed_body=unknown_root, feed_headers={}) == []
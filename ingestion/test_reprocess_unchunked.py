@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the write-back in reprocess_unchunked.
+
+Every article that fails is reported exactly once, whichever step failed.
+"""
+
+import reprocess_unchunked
+from embedder import MockEmbedder
+from reprocess_unchunked import flush_processed
+
+LONG_TEXT = "OpenAI releases GPT-5 with improved reasoning capabilities. " * 60
+
+
+class FakeQuery:
+    def __init__(self, client, rows):
+        self.client = client
+        self.rows = rows if isinstance(rows, list) else [rows]
+
+    def execute(self):
+        if self.client.fail_updates or any(row["id"] in self.client.bad_ids for row in self.rows):
+            raise RuntimeError("update failed")
+        self.client.updated.extend(row["id"] for row in self.rows)
+
+
+class FakeClient:
+    def __init__(self, fail_updates=False, bad_ids=()):
+        self.fail_updates = fail_updates
+        self.bad_ids = set(bad_ids)
+        self.updated = []
+
+    def table(self, name):
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        return FakeQuery(self, rows)
+
+
+class FlakyEmbedder(MockEmbedder):
+    """Fails to embed the chunks of one article."""
+
+    def __init__(self, bad_id):
+        super().__init__()
+        self.bad_id = bad_id
+
+    def embed_chunks(self, chunks):
+        if chunks[0].article_id == self.bad_id:
+            raise RuntimeError("embedding failed")
+        return super().embed_chunks(chunks)
+
+
+class FakeStorage:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.stored = []
+
+    def _get_client(self):
+        return self.client
+
+    def store_embedded_chunks(self, chunks):
+        if self.fail:
+            raise RuntimeError("storage failed")
+        self.stored.extend(chunks)
+        return len(chunks)
+
+
+def test_failed_update_and_storage_count_each_article_once():
+    pending = [
+        ({"id": "a"}, True, ["a0", "a1"]),  # update fails
+        ({"id": "b"}, True, []),  # already failed to chunk or embed
+        ({"id": "c"}, False, ["c0"]),  # storage fails
+    ]
+    assert flush_processed(FakeClient(fail_updates=True), FakeStorage(fail=True), pending) == (0, 2)
+
+
+def test_chunks_stored_only_after_their_update():
+    client, storage = FakeClient(bad_ids={"a"}), FakeStorage()
+    pending = [
+        ({"id": "a"}, True, ["a0"]),
+        ({"id": "b"}, True, ["b0", "b1"]),
+        ({"id": "c"}, False, ["c0"]),
+    ]
+    assert flush_processed(client, storage, pending) == (3, 1)
+    assert client.updated == ["b"]
+    assert storage.stored == ["b0", "b1", "c0"]
+
+
+def test_reprocess_reports_one_failure_per_article(monkeypatch, capsys):
+    rows = [
+        # Chunks fine, but its updated row can't be written
+        {"id": "bad", "title": "T", "url": "u1", "content": LONG_TEXT, "source_name": "S", "keywords": []},
+        # Fails to embed, and its updated row can't be written either
+        {"id": "unembedded", "title": "T", "url": "u2", "content": LONG_TEXT, "source_name": "S", "keywords": []},
+    ]
+    storage = FakeStorage(fail=True)
+    storage.client = FakeClient(fail_updates=True)
+    monkeypatch.setattr(reprocess_unchunked, "get_storage", lambda use_local: storage)
+    monkeypatch.setattr(reprocess_unchunked, "get_embedder", lambda use_mock: FlakyEmbedder("unembedded"))
+    monkeypatch.setattr(reprocess_unchunked, "get_unchunked_articles", lambda client, source_name=None: rows)
+    monkeypatch.setattr(reprocess_unchunked, "fetch_full_contents", lambda urls: {})
+    monkeypatch.setattr(reprocess_unchunked, "classify_text", lambda text: ["OpenAI"])
+
+    reprocess_unchunked.reprocess_articles(use_mock=True)
+
+    assert "Failed: 2" in capsys.readouterr().out
+    assert storage.stored == []
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for LocalStorage's float16 embedding sidecar.
+"""
+
+import os
+
+import numpy as np
+import orjson
+
+from config import EMBEDDING_CONFIG
+from embedder import EmbeddedChunk
+from storage import LocalStorage
+
+ROW_BYTES = EMBEDDING_CONFIG.dimensions * 2
+
+
+def embedded_chunks(n):
+    rng = np.random.default_rng(0)
+    return [
+        EmbeddedChunk(
+            chunk_id=f"a_{i:03d}",
+            article_id="a",
+            chunk_index=i,
+            text=f"chunk {i}",
+            embedding=rng.standard_normal(EMBEDDING_CONFIG.dimensions).astype(np.float32),
+            article_title="A",
+            article_url="https://example.com/a",
+            source_name="S",
+            source_category="research",
+            published_at=None,
+        )
+        for i in range(n)
+    ]
+
+
+def search_ids(storage, chunk):
+    return [r["chunk_id"] for r in storage.search_similar(chunk.embedding.tolist(), 10, -1.0)]
+
+
+def test_search_ranks_stored_chunks(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    chunks = embedded_chunks(5)
+    assert storage.store_embedded_chunks(chunks) == 5
+    assert os.path.getsize(storage.embeddings_file) == 5 * ROW_BYTES
+
+    results = storage.search_similar(chunks[2].embedding.tolist(), 3, -1.0)
+    assert results[0]["chunk_id"] == "a_002"
+    assert abs(results[0]["similarity"] - 1) < 1e-3
+    assert "embedding" not in results[0]
+
+
+def test_truncated_sidecar_skips_missing_rows(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    chunks = embedded_chunks(5)
+    storage.store_embedded_chunks(chunks)
+    with open(storage.embeddings_file, "r+b") as f:
+        f.truncate(3 * ROW_BYTES + 10)  # 3 whole rows and a torn one
+
+    assert sorted(search_ids(LocalStorage(str(tmp_path)), chunks[0])) == ["a_000", "a_001", "a_002"]
+
+
+def test_empty_or_deleted_sidecar_searches_nothing(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    chunks = embedded_chunks(3)
+    storage.store_embedded_chunks(chunks)
+
+    open(storage.embeddings_file, "wb").close()
+    assert search_ids(LocalStorage(str(tmp_path)), chunks[0]) == []
+
+    os.remove(storage.embeddings_file)
+    assert search_ids(storage, chunks[0]) == []
+    # Reopening recreates an empty sidecar; still nothing to rank
+    assert search_ids(LocalStorage(str(tmp_path)), chunks[0]) == []
+
+
+def test_inline_embeddings_move_to_sidecar(tmp_path):
+    chunks = embedded_chunks(2)
+    with open(tmp_path / "chunks.json", "wb") as f:
+        f.write(orjson.dumps([c.to_dict() for c in chunks]))
+
+    storage = LocalStorage(str(tmp_path))
+    with open(storage.chunks_file, "rb") as f:
+        rows = [orjson.loads(line) for line in f]
+    assert [r["embedding_row"] for r in rows] == [0, 1]
+    assert all("embedding" not in r for r in rows)
+    assert search_ids(storage, chunks[1])[0] == "a_001"